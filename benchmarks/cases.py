@@ -0,0 +1,315 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from collections import namedtuple
+import importlib.util
+from io import BytesIO, StringIO
+from pathlib import Path
+import sys
+
+from benchmarks import fixtures
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# prepare(folder, scale) writes the fixtures and returns the inputs for
+# parse(inputs). transform takes parse's result, and render(data, folder) draws
+# transform's result into the folder. Each stage is timed on its own.
+Case = namedtuple('Case', ['name', 'prepare', 'parse', 'transform', 'render'])
+
+CASES = dict()
+
+
+def case(name):
+    # Register a function returning (prepare, parse, transform, render)
+    def register(build):
+        CASES[name] = lambda: Case(name, *build())
+        return build
+    return register
+
+
+def add_to_path(folder):
+    # So scripts can import their neighbours
+    folder = str(ROOT / folder)
+    if folder not in sys.path:
+        sys.path.insert(0, folder)
+
+
+def load_script(relative_path):
+    # The scripts live in folders with spaces in and aren't packages, so load
+    # them by path. Their draw functions set their own matplotlib style, so
+    # cases don't leak styles into each other.
+    path = ROOT / relative_path
+    add_to_path(path.parent)
+
+    name = 'bench_' + path.stem.replace('-', '_')
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@case('midas')
+def midas_case():
+    add_to_path('weather/interactive_map')
+    import midas
+    from density import grouped_density
+    from graph_all_air_temps import HOURS, PLOT_PARAMS
+
+    def prepare(folder, scale):
+        path = folder / 'midas.csv'
+        fixtures.midas_csv(path, years=scale)
+        return path.read_bytes()
+
+    def parse(payload):
+        return midas.read_midas_csv(
+            BytesIO(payload), columns=[PLOT_PARAMS['value']]
+        )
+
+    def transform(data):
+        data = data[data['Hour'].between(*HOURS)]
+        month_hues = data.groupby('Month')[PLOT_PARAMS['value']].mean()\
+                         .reindex(midas.MONTHS)
+        densities = grouped_density(
+            data[PLOT_PARAMS['value']], data['Month'].cat.codes,
+            len(midas.MONTHS), bw=PLOT_PARAMS['shape_params']['bw']
+        )
+        return month_hues, densities
+
+    def render(prepared, folder):
+        month_hues, densities = prepared
+        draw_month = midas.density_drawer(
+            densities, 'whitesmoke', dict(alpha=1, lw=0), dict(lw=3)
+        )
+        midas.ridge_plot(
+            month_hues, draw_month, 'Benchmark', PLOT_PARAMS['hue_label'],
+            PLOT_PARAMS['x_label'], PLOT_PARAMS['attribution'],
+            folder / 'midas.png', value_format=PLOT_PARAMS['value_format'],
+            facet_params=PLOT_PARAMS['facet_params']
+        )
+
+    return prepare, parse, transform, render
+
+
+@case('league_standings')
+def league_case():
+    get_seasons = load_script('football/league_standings/get_seasons.py')
+    draw_graphs = load_script('football/league_standings/draw_graphs.py')
+
+    def prepare(folder, scale):
+        fixtures.rsssf_engall(folder / 'engall.html', teams=200 * scale)
+        fixtures.tiers_workbook(folder / 'tiers.xlsx', teams=92 * scale)
+        return (folder / 'engall.html').read_bytes(), folder / 'tiers.xlsx'
+
+    def parse(inputs):
+        html, workbook = inputs
+        return (
+            get_seasons.parse_engall(html),
+            get_seasons.read_newer_seasons(workbook)
+        )
+
+    def transform(parsed):
+        seasons = draw_graphs.TierMatrix.from_frame(
+            get_seasons.combine_seasons(*parsed)
+        )
+        outsiders = draw_graphs.get_outsiders(seasons)
+        return (
+            draw_graphs.top_outsiders(seasons, outsiders),
+            draw_graphs.top_nearly_men(seasons, outsiders)
+        )
+
+    def render(charts, folder):
+        top_ten, nearly = charts
+        draw_graphs.render_charts(
+            [
+                draw_graphs.outsiders_chart(top_ten, folder),
+                draw_graphs.nearly_men_chart(nearly, folder)
+            ],
+            draw_graphs.STYLE, report=False
+        )
+
+    return prepare, parse, transform, render
+
+
+@case('champions')
+def champions_case():
+    champions = load_script('football/big five champions/champions.py')
+
+    def prepare(folder, scale):
+        pages = dict()
+        for i, country in enumerate(champions.path_lookups):
+            path = folder / f'{country}.html'
+            fixtures.rsssf_champions(path, seasons=120 * scale, seed=i)
+            pages[country] = path.read_bytes()
+
+        # Badges for every team that could win. Recoloured copies are cached
+        # in the folder, so only the first render pays for making them.
+        teams = {
+            team for i in range(len(pages))
+            for team in fixtures.team_names(30, i)
+        }
+        fixtures.badges(folder, sorted(teams))
+        return pages
+
+    def parse(pages):
+        results = []
+        for country, html in pages.items():
+            results.extend(champions.parse_champions(html, country))
+        return results
+
+    def transform(results):
+        return champions.most_titles(champions.tidy_champions(results))
+
+    def render(top_dogs, folder):
+        champions.draw_champions(
+            top_dogs, folder / 'champions.png', badge_folder=folder
+        )
+
+    return prepare, parse, transform, render
+
+
+@case('goalscorers')
+def goalscorers_case():
+    scorers = load_script('football/goalscorers/scorers.py')
+
+    def prepare(folder, scale):
+        fixtures.goalscorers_csv(folder / 'goalscorers.csv', players=100 * scale)
+        return folder / 'goalscorers.csv'
+
+    def render(df, folder):
+        scorers.draw_scorers(df, folder / 'scorers.png', font_folder=None)
+
+    return prepare, scorers.load_scorers, lambda df: df, render
+
+
+@case('gig_calendar')
+def gig_calendar_case():
+    read_ics = load_script('gig calendar/2019/read_ics.py')
+    make_cal = load_script('gig calendar/2019/make_cal.py')
+
+    def prepare(folder, scale):
+        fixtures.ics_calendar(folder / 'events.ics', events=100 * scale)
+        return folder
+
+    def parse(folder):
+        # The same route as the real thing: calendar to CSV, CSV to frame
+        calendar = read_ics.read_calendar(folder / 'events.ics')
+        read_ics.write_events(
+            read_ics.events_in_year(calendar), folder / 'events.csv'
+        )
+        return make_cal.load_gigs(folder / 'events.csv')
+
+    def render(days, folder):
+        make_cal.draw_calendar(days, folder / 'calendar.png')
+
+    return prepare, parse, make_cal.gig_days, render
+
+
+@case('halloween')
+def halloween_case():
+    heartrate = load_script('halloween/heartrate.py')
+    timetable = load_script('halloween/timetable.py')
+
+    def prepare(folder, scale):
+        return fixtures.fit_monitoring(per_minute=scale)
+
+    def transform(records):
+        return heartrate.tag_films(records, heartrate.film_durations())
+
+    def render(film_times, folder):
+        heartrate.draw_heartrate(
+            film_times, folder / 'heartrate.png', font_path=None
+        )
+        timetable.draw_timetable(
+            timetable.film_durations(), folder / 'timetable.png',
+            font_path=None
+        )
+
+    return prepare, heartrate.monitoring_records, transform, render
+
+
+@case('injuries')
+def injuries_case():
+    yearly_totals = load_script('nfl/injury data/yearly_totals.py')
+
+    def prepare(folder, scale):
+        fixtures.injury_workbook(folder / 'injuries.xlsx', years=10 * scale)
+        return folder / 'injuries.xlsx'
+
+    def transform(frames):
+        return {
+            injury: yearly_totals.season_totals(data)
+            for injury, data in frames.items()
+        }
+
+    def render(totals, folder):
+        yearly_totals.draw_all(totals, folder, report=False)
+
+    return prepare, yearly_totals.read_injuries, transform, render
+
+
+@case('headliners')
+def headliners_case():
+    headliners = load_script('music/download headliners/headliner-repeats.py')
+
+    def prepare(folder, scale):
+        fixtures.headliners_csv(folder / 'headliners.csv', years=20 * scale)
+        return folder / 'headliners.csv'
+
+    def render(tables, folder):
+        headliners.draw_headliners(*tables, folder / 'headliners.png')
+
+    return (
+        prepare, headliners.load_headliners, headliners.appearance_matrix,
+        render
+    )
+
+
+@case('biffy_charts')
+def biffy_case():
+    import pandas as pd
+    biffy = load_script('music/charts/biffy_charts.py')
+
+    def prepare(folder, scale):
+        return fixtures.officialcharts_html(releases=30 * scale)
+
+    def parse(html):
+        singles, albums = pd.read_html(StringIO(html))
+        return singles, albums
+
+    def transform(tables):
+        return biffy.tidy_releases(*tables)
+
+    def render(releases, folder):
+        biffy.draw_releases(releases, folder / 'biffy.png')
+
+    return prepare, parse, transform, render
+
+
+@case('bi_history')
+def bi_history_case():
+    population = load_script('bi history/uk_bi_population.py')
+
+    def prepare(folder, scale):
+        # The ONS tables are a fixed size, so scale doesn't change anything
+        fixtures.ons_workbook(folder / 'ons.xlsx')
+        return folder / 'ons.xlsx'
+
+    def parse(path):
+        sheets = population.read_sheet([2, 3], path=path)
+        return sheets[2], sheets[3]
+
+    def transform(sheets):
+        total_pop, age_pop = sheets
+        return (
+            population.bi_totals(total_pop),
+            population.bi_latest_ages(age_pop)
+        )
+
+    def render(tables, folder):
+        bi_pop, bi_latest = tables
+        population.draw_totals(bi_pop, folder / 'totals.png')
+        population.draw_age_groups(
+            bi_latest, len(bi_pop), folder / 'ages.png'
+        )
+
+    return prepare, parse, transform, render
@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import statistics
+import sys
+from tempfile import TemporaryDirectory
+from threading import Thread
+from time import perf_counter, sleep
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from benchmarks.cases import load_script  # noqa: E402
+from common.fetch import HttpCache, NotCached  # noqa: E402
+
+
+# Fetching and parsing the five champions pages, one after another against
+# all at once, and BeautifulSoup against the <pre> extractor. Pages come from
+# a folder of saved copies, the HTTP cache, or failing those the synthetic
+# fixtures. Fetches go to a local server that waits before answering, standing
+# in for RSSSF's response times.
+champions = load_script('football/big five champions/champions.py')
+
+
+def saved_pages(folder=None):
+    if folder:
+        return {
+            country: (Path(folder) / f'{code}.html').read_bytes()
+            for country, code in champions.path_lookups.items()
+        }
+
+    cache = HttpCache(offline=True)
+    try:
+        return {
+            country: cache.get(champions.champions_url(code))
+            for country, code in champions.path_lookups.items()
+        }
+    except NotCached:
+        return None
+
+
+def synthetic_pages(scale):
+    from benchmarks import fixtures
+
+    pages = dict()
+    with TemporaryDirectory() as folder:
+        for i, country in enumerate(champions.path_lookups):
+            path = Path(folder) / f'{country}.html'
+            fixtures.rsssf_champions(path, seasons=120 * scale, seed=i)
+            pages[country] = path.read_bytes()
+    return pages
+
+
+def serve(pages, latency):
+    by_path = {
+        f'/{code}.html': pages[country]
+        for country, code in champions.path_lookups.items()
+    }
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            sleep(latency)
+            body = by_path[self.path]
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        result = func()
+        timings.append(perf_counter() - start)
+    return result, min(timings), statistics.median(timings)
+
+
+def fetch_timings(pages, latency, repeat):
+    server = serve(pages, latency)
+    base = f'http://127.0.0.1:{server.server_port}'
+    champions.champions_url = lambda code: f'{base}/{code}.html'
+
+    def sequential():
+        return {
+            country: champions.fetch_page(code)
+            for country, code in champions.path_lookups.items()
+        }
+
+    rows = []
+    try:
+        for name, func in (('sequential', sequential),
+                           ('concurrent', champions.fetch_pages)):
+            # An empty cache each time, so every page really is downloaded
+            with TemporaryDirectory() as folder:
+                def run():
+                    champions.fetch = HttpCache(folder, max_age=0).get
+                    return func()
+                _, best, median = best_of(run, repeat)
+            rows.append((f'fetch {name}', best, median))
+    finally:
+        server.shutdown()
+    return rows
+
+
+def parse_timings(pages, repeat):
+    rows = []
+    results = dict()
+    for parser in ('bs4', 'fast'):
+        for jobs in (1, len(pages)):
+            func = partial(champions.parse_pages, pages, parser, jobs)
+            try:
+                results[parser], best, median = best_of(func, repeat)
+            except ImportError as e:
+                print(f'Skipping {parser}: missing {e.name}', file=sys.stderr)
+                break
+            mode = 'serial' if jobs == 1 else f'{jobs} processes'
+            rows.append((f'parse {parser}, {mode}', best, median))
+
+    if len(results) == 2 and results['bs4'] != results['fast']:
+        print('Warning: the parsers found different champions', file=sys.stderr)
+    return rows
+
+
+def print_rows(rows):
+    print(f"{'':<28}{'best':>10}{'median':>10}{'speedup':>10}")
+    for group in ('fetch', 'parse'):
+        group_rows = [row for row in rows if row[0].startswith(group)]
+        if not group_rows:
+            continue
+        baseline = group_rows[0][1]
+        for name, best, median in group_rows:
+            print(
+                f'{name:<28}{best * 1000:>8.1f}ms{median * 1000:>8.1f}ms'
+                f'{baseline / best:>9.1f}x'
+            )
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(
+        description='Compare ways of fetching and parsing the champions pages'
+    )
+    parser.add_argument(
+        '--pages', metavar='FOLDER',
+        help='Saved copies of the pages, named by code (eng.html, fran.html, '
+             '...). Defaults to the HTTP cache, then synthetic pages.'
+    )
+    parser.add_argument(
+        '--latency', type=float, default=0.5,
+        help='Seconds the local server waits before answering each request'
+    )
+    parser.add_argument('--scale', type=int, default=1,
+                        help='Size of the synthetic pages')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    pages = saved_pages(args.pages)
+    if pages is None:
+        print('Pages not cached, using synthetic ones', file=sys.stderr)
+        pages = synthetic_pages(args.scale)
+
+    print(f'{len(pages)} pages, {sum(map(len, pages.values())) / 1024:.0f}kB')
+    rows = parse_timings(pages, args.repeat)
+    rows.extend(fetch_timings(pages, args.latency, args.repeat))
+    print_rows(rows)
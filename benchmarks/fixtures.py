@@ -0,0 +1,313 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from datetime import datetime, timedelta
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+
+# Synthetic inputs shaped like each script's real data source. Everything is
+# seeded, so the same scale always gives the same bytes, and nothing needs the
+# network.
+
+WORDS = [
+    'Athletic', 'Rovers', 'United', 'Town', 'City', 'Wanderers', 'Albion',
+    'Rangers', 'Villa', 'County', 'Argyle', 'Orient', 'Borough', 'Forest',
+    'Wednesday', 'Vale', 'Stanley', 'Dons', 'Hotspur', 'Alexandra',
+]
+PLACES = [
+    'Ashby', 'Barford', 'Carlow', 'Denholm', 'Eastwick', 'Farley', 'Glenmore',
+    'Harrow', 'Ilford', 'Jesmond', 'Kelby', 'Langley', 'Marston', 'Norwood',
+    'Oakham', 'Penrith', 'Quarley', 'Redhill', 'Selby', 'Thornton',
+]
+TIERS = ['I', 'II', 'III', 'IV']
+
+
+def team_names(count, seed=0):
+    rng = np.random.default_rng(seed)
+    names = set()
+    while len(names) < count:
+        place = PLACES[rng.integers(len(PLACES))]
+        suffix = WORDS[rng.integers(len(WORDS))]
+        # Plenty of combinations once we add a number for big scales
+        number = '' if len(names) < 300 else f' {rng.integers(1, 10 ** 6)}'
+        names.add(f'{place}{number} {suffix}')
+    return sorted(names)
+
+
+def midas_csv(path, years=1, seed=0):
+    # BADC-CSV hourly observations: metadata block, "data", header, rows and
+    # the "end data" footer
+    rng = np.random.default_rng(seed)
+    times = pd.date_range('2017-01-01', periods=years * 365 * 24, freq='h')
+    seasonal = 9 - 6 * np.cos(2 * np.pi * times.dayofyear / 365)
+    frame = pd.DataFrame({
+        'ob_time': times.strftime('%Y-%m-%d %H:%M:%S'),
+        'id': 1234, 'id_type': 'DCNN', 'met_domain_name': 'SYNOP',
+        'src_id': 253,
+        'wind_speed': rng.integers(0, 30, len(times)),
+        'air_temperature': (seasonal + rng.normal(0, 3, len(times))).round(1),
+        'dewpoint': (seasonal - 2 + rng.normal(0, 3, len(times))).round(1),
+        'msl_pressure': rng.normal(1012, 10, len(times)).round(1),
+        'air_temperature_q': 1,
+    })
+
+    with open(path, 'w') as f:
+        f.write('Conventions,G,BADC-CSV,1\n')
+        for i in range(278):
+            f.write(f'comments,G,Synthetic metadata line {i}\n')
+        f.write('data\n')
+        frame.to_csv(f, index=False)
+        f.write('end data\n')
+
+
+def rsssf_engall(path, teams=200, seed=0):
+    # The all-time league table: a team line, then one line per tier played
+    rng = np.random.default_rng(seed)
+    lines = []
+    for team in team_names(teams, seed):
+        lines.append(f'{team} ({PLACES[rng.integers(len(PLACES))]})')
+        for tier in rng.choice(TIERS, rng.integers(1, 5), replace=False):
+            first = rng.integers(1888, 2000)
+            lines.append(
+                f'  {first}-{first + rng.integers(1, 20)}  {tier:<4}'
+                f'{rng.integers(1, 100):>4}'
+            )
+
+    with open(path, 'w') as f:
+        f.write('<html><body><h1>England - All-Time Tables</h1>\n')
+        f.write('<pre>\nKey to the table below\n</pre>\n')
+        f.write('<pre>\n' + '\n'.join(lines) + '\n</pre>\n')
+        f.write('</body></html>\n')
+
+
+def rsssf_champions(path, seasons=120, seed=0):
+    # A champions page: one season per line, some with a marker before the
+    # team, split across a few <pre> blocks like the real pages
+    rng = np.random.default_rng(seed)
+    teams = team_names(30, seed)
+    last = 2020
+
+    blocks = [[]]
+    for i, year in enumerate(range(last - seasons + 1, last + 1)):
+        season = f'{year - 1}/{str(year)[2:]}' if rng.random() < .7 else str(year)
+        marker = ' *' if rng.random() < .05 else ''
+        team = teams[min(int(rng.exponential(5)), len(teams) - 1)]
+        blocks[-1].append(f'{season}{marker}  {team}{"":<4}{rng.integers(40, 100)}')
+        if i and i % 40 == 0:
+            blocks.append([])
+
+    with open(path, 'w') as f:
+        f.write('<html><body><h1>Champions</h1>\n')
+        for block in blocks:
+            f.write('<pre>\n' + '\n'.join(block) + '\n</pre>\n<p>Notes</p>\n')
+        f.write('</body></html>\n')
+
+
+def badges(folder, teams, size=256, seed=0):
+    # A full-size RGBA badge per team: a gradient disc on a transparent
+    # background, which recolours much like a real crest
+    from PIL import Image
+
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[-1:1:size * 1j, -1:1:size * 1j]
+    alpha = np.where(x ** 2 + y ** 2 <= 1, 255, 0).astype(np.uint8)
+    for team in teams:
+        shade = (rng.random(3) * (x[..., None] + 1) * 127).astype(np.uint8)
+        Image.fromarray(np.dstack([shade, alpha])).save(folder / f'{team}.png')
+
+
+def tiers_workbook(path, seasons=4, teams=92, seed=0):
+    # One sheet per season, one row per team with the tier it played in
+    rng = np.random.default_rng(seed)
+    names = team_names(teams, seed)
+    with pd.ExcelWriter(path) as writer:
+        for season in range(seasons):
+            pd.DataFrame({
+                'Team': names,
+                'Tier': rng.choice(TIERS, len(names)),
+            }).to_excel(writer, sheet_name=f'{16 + season}{17 + season}', index=False)
+
+
+def tier_seasons(teams=5000, seed=0):
+    # Tier Seasons.csv as combine_seasons leaves it, with each team in one
+    # to four tiers
+    rng = np.random.default_rng(seed)
+    records = []
+    for team in team_names(teams, seed):
+        played = sorted(rng.choice(4, rng.integers(1, 5), replace=False))
+        for level in played:
+            records.append((team, TIERS[level], int(rng.integers(1, 100))))
+
+    df = pd.DataFrame.from_records(records, columns=['Team', 'Tier', 'Seasons'])
+    df['Numeric Level'] = df['Tier'].map({t: i + 1 for i, t in enumerate(TIERS)})
+    df['Highest Level'] = df.groupby('Team')['Numeric Level'].transform('min')
+    df['Total Seasons'] = df.groupby('Team')['Seasons'].transform('sum')
+    return df
+
+
+def goalscorers_csv(path, players=100, seed=0):
+    rng = np.random.default_rng(seed)
+    goals = np.sort(rng.integers(150, 450, players))[::-1]
+    start = rng.integers(1890, 2000, players)
+    pd.DataFrame({
+        'Name': [f'Player {i}' for i in range(players)],
+        'Goals': goals,
+        'Career': [f'{s}-{s + rng.integers(8, 20)}' for s in start],
+        'Clubs': [', '.join(team_names(3, i)) for i in range(players)],
+    }).to_csv(path, index=False)
+
+
+# Looks enough like fitparse's fields for heartrate.monitoring_records
+FitField = namedtuple('FitField', ['name', 'value'])
+
+
+def fit_monitoring(day=datetime(2020, 10, 31), per_minute=1, seed=0):
+    # Monitoring messages for one day: a full timestamp every quarter hour, and
+    # heart rate messages in between that only carry the low 16 bits of the
+    # timestamp, like a Garmin watch writes them
+    rng = np.random.default_rng(seed)
+    step = timedelta(seconds=60 // per_minute)
+    current = day.replace(hour=10)
+    end = day.replace(hour=23, minute=30)
+
+    messages = []
+    heart_rate = 70
+    while current <= end:
+        if current.minute % 15 == 0 and current.second == 0:
+            messages.append([FitField('timestamp', current)])
+        heart_rate = int(np.clip(heart_rate + rng.integers(-3, 4), 50, 150))
+        fit_time = int(datetime.timestamp(current)) - 631065600
+        messages.append([
+            FitField('timestamp_16', fit_time & 0xffff),
+            FitField('heart_rate', heart_rate),
+        ])
+        current += step
+    return messages
+
+
+def ics_calendar(path, events=100, seed=0):
+    rng = np.random.default_rng(seed)
+    start = datetime(2018, 10, 1)
+
+    lines = ['BEGIN:VCALENDAR', 'VERSION:2.0', 'PRODID:-//benchmarks//EN']
+    for i in range(events):
+        begin = start + timedelta(
+            days=int(rng.integers(0, 455)), hours=int(rng.integers(17, 21))
+        )
+        end = begin + timedelta(hours=int(rng.integers(3, 6)))
+        if rng.random() < .1:
+            # A festival, over a few days
+            end += timedelta(days=int(rng.integers(1, 4)))
+        lines += [
+            'BEGIN:VEVENT',
+            f'UID:{i}@benchmarks',
+            f'DTSTAMP:{start:%Y%m%dT%H%M%SZ}',
+            f'DTSTART:{begin:%Y%m%dT%H%M%SZ}',
+            f'DTEND:{end:%Y%m%dT%H%M%SZ}',
+            f'SUMMARY:{team_names(1, i)[0]} live',
+            f'LOCATION:{PLACES[i % len(PLACES)]} Academy',
+            'END:VEVENT',
+        ]
+    lines.append('END:VCALENDAR')
+
+    with open(path, 'w', newline='') as f:
+        f.write('\r\n'.join(lines) + '\r\n')
+
+
+def injury_workbook(path, injuries=4, years=10, seed=0):
+    # One sheet per injury type, with a two-row header:
+    # (season part, practice/game/total) and the year down the side
+    rng = np.random.default_rng(seed)
+    parts = ['Preseason + Regular Season', 'Regular Season']
+    kinds = ['Practice', 'Game', 'Total']
+
+    with pd.ExcelWriter(path) as writer:
+        for injury in range(injuries):
+            rows = [
+                [None] + [p for p in parts for _ in kinds],
+                ['Year'] + kinds * len(parts),
+            ]
+            for year in range(2019 - years, 2019):
+                practice, game = rng.integers(5, 150, 2)
+                rows.append(
+                    [year] + [practice, game, practice + game] * len(parts)
+                )
+            pd.DataFrame(rows).to_excel(
+                writer, sheet_name=f'Injury {injury}', header=False,
+                index=False
+            )
+
+
+def headliners_csv(path, years=20, seed=0):
+    # Friday to Sunday each June, headliners picked from a small pool so
+    # there are plenty of repeat appearances
+    rng = np.random.default_rng(seed)
+    bands = [f'Band {i}' for i in range(max(10, years))]
+    rows = []
+    for year in range(2020 - years, 2020):
+        friday = datetime(year, 6, 8)
+        friday += timedelta(days=(4 - friday.weekday()) % 7)
+        for day, band in enumerate(rng.choice(bands, 3, replace=False)):
+            date = friday + timedelta(days=day)
+            rows.append({'Date': date.strftime('%d/%m/%Y'), 'Headliner': band})
+    pd.DataFrame(rows).to_csv(path, index=False)
+
+
+def officialcharts_html(releases=30, seed=0):
+    # Artist page with a singles table and an albums table
+    rng = np.random.default_rng(seed)
+
+    def table(kind):
+        rows = []
+        for i in range(releases):
+            date = datetime(2000, 1, 1) + timedelta(days=int(rng.integers(0, 7300)))
+            for week in range(int(rng.integers(1, 4))):
+                rows.append(
+                    f'<tr><td>{(date + timedelta(weeks=week)):%d. %m. %Y}</td>'
+                    f'<td>{kind} {i} BIFFY CLYRO</td>'
+                    f'<td>{rng.integers(1, 100)}</td>'
+                    f'<td>{rng.integers(1, 10)}</td></tr>'
+                )
+        return (
+            '<table><thead><tr><th>Date</th><th>Title, Artist</th>'
+            '<th>Peak Pos</th><th>WoC</th></tr></thead><tbody>'
+            + ''.join(rows) + '</tbody></table>'
+        )
+
+    return f'<html><body>{table("SINGLE")}{table("ALBUM")}</body></html>'
+
+
+def ons_workbook(path, seed=0):
+    # Sheets laid out like the ONS sexual identity workbook: three lines of
+    # notes, a two-row header and 24 rows of estimates, with the year only
+    # on the first row of each block
+    rng = np.random.default_rng(seed)
+    years = range(2013, 2019)
+    identities = ['Heterosexual', 'Bisexual', 'Gay or Lesbian', 'Other']
+    ages = ['16-24', '25-34', '35-49', '50-64', '65+']
+
+    def sheet(groups):
+        rows = [['Notes'], [], []]
+        rows.append([None, None] + [g for g in groups for _ in range(2)])
+        rows.append(['Year', 'Identity'] + ['Estimate', 'CI'] * len(groups))
+        for year in years:
+            for i, identity in enumerate(identities):
+                values = []
+                for _ in groups:
+                    values += [int(rng.integers(50, 5000)), 0.5]
+                rows.append([year if i == 0 else None, identity] + values)
+        return pd.DataFrame(rows)
+
+    with pd.ExcelWriter(path) as writer:
+        for name in ('Contents', 'Notes'):
+            pd.DataFrame([[name]]).to_excel(
+                writer, sheet_name=name, header=False, index=False
+            )
+        sheet(['Male', 'Female']).to_excel(
+            writer, sheet_name='Sex', header=False, index=False
+        )
+        sheet(ages).to_excel(
+            writer, sheet_name='Age', header=False, index=False
+        )
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from argparse import ArgumentParser
+from io import BytesIO
+from pathlib import Path
+import re
+import sys
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from benchmarks import fixtures  # noqa: E402
+from common import rsssf  # noqa: E402
+from common.scrape import pre_blocks  # noqa: E402
+
+
+# Throughput of the RSSSF parsers on a large synthetic all-time table, against
+# the way get_seasons.py used to do it: two patterns tried on every line of
+# the <pre> block BeautifulSoup found.
+name_pattern = re.compile(r'^(?P<team>[\w\s\']+)\(')
+season_pattern = re.compile(r'[\d\s]+(?P<tier>I{1,3}|IV)\s+(?P<seasons>\d+)')
+
+
+def two_patterns(content):
+    season_data = []
+    for line in content.splitlines():
+        name = name_pattern.search(line)
+        if name:
+            team_name = name.group('team').strip()
+            continue
+
+        seasons = season_pattern.search(line)
+        if seasons:
+            season_data.append(
+                [team_name, seasons.group('tier'), int(seasons.group('seasons'))]
+            )
+    return season_data
+
+
+def legacy_bs4(page):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(page, features='html.parser')
+    return two_patterns(soup.find_all('pre')[1].text)
+
+
+def legacy_pre_blocks(page):
+    return two_patterns(pre_blocks(page)[1])
+
+
+def single_pass(page):
+    return list(rsssf.league_tiers(rsssf.pre_text(page, blocks={1})))
+
+
+def single_pass_stream(page):
+    # As if reading straight from a response, a line at a time
+    return list(rsssf.league_tiers(rsssf.pre_text(BytesIO(page), blocks={1})))
+
+
+METHODS = {
+    'bs4 + two patterns': legacy_bs4,
+    '<pre> regex + two patterns': legacy_pre_blocks,
+    'rsssf single pass': single_pass,
+    'rsssf single pass, streamed': single_pass_stream,
+}
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(
+        description='Time the RSSSF league table parsers on a synthetic page'
+    )
+    parser.add_argument('--teams', type=int, default=20_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with TemporaryDirectory() as folder:
+        path = Path(folder) / 'engall.html'
+        fixtures.rsssf_engall(path, teams=args.teams)
+        page = path.read_bytes()
+
+    megabytes = len(page) / 1024 ** 2
+    print(f'{args.teams} teams, {megabytes:.1f}MB')
+    print(f"{'':<30}{'best':>10}{'MB/s':>10}{'records/s':>12}")
+
+    expected = None
+    for name, method in METHODS.items():
+        timings = []
+        try:
+            for _ in range(args.repeat):
+                start = perf_counter()
+                records = method(page)
+                timings.append(perf_counter() - start)
+        except ImportError as e:
+            print(f'{name:<30}  missing {e.name}')
+            continue
+
+        # Every method should find exactly the same seasons
+        records = [tuple(record) for record in records]
+        if expected is None:
+            expected = records
+        elif records != expected:
+            print(f'Warning: {name} found different records', file=sys.stderr)
+
+        best = min(timings)
+        print(
+            f'{name:<30}{best * 1000:>8.0f}ms{megabytes / best:>10.1f}'
+            f'{len(records) / best:>12,.0f}'
+        )
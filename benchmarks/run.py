@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from argparse import ArgumentParser
+from contextlib import contextmanager
+import json
+import logging
+import os
+from pathlib import Path
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+from tempfile import TemporaryDirectory
+from time import perf_counter
+import traceback
+import warnings
+
+# Run from anywhere, and make sure everything draws on Agg before any of the
+# scripts get a chance to pick a backend
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import common.render  # noqa: E402,F401
+
+from benchmarks.cases import CASES, ROOT  # noqa: E402
+
+
+STAGES = ('parse', 'transform', 'render')
+
+
+@contextmanager
+def no_network():
+    # The fixtures are all local. Make sure nothing sneaks off to the internet
+    # and makes the timings depend on someone else's server.
+    def refuse(*args, **kwargs):
+        raise RuntimeError('Benchmarks must not use the network')
+
+    original = socket.socket.connect
+    socket.socket.connect = refuse
+    try:
+        yield
+    finally:
+        socket.socket.connect = original
+
+
+def time_stage(func, arg, repeat, *extra):
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        result = func(arg, *extra)
+        timings.append(perf_counter() - start)
+    return result, {
+        'best': min(timings), 'median': statistics.median(timings),
+        'runs': timings,
+    }
+
+
+def run_case(name, scale, repeat):
+    # Not everything's dependencies will be installed everywhere. The scripts
+    # import them as they need them, so that can be at any stage.
+    try:
+        return time_case(CASES[name](), scale, repeat)
+    except ImportError as e:
+        return {'skipped': f'missing dependency: {e.name or e}'}
+
+
+def time_case(case, scale, repeat):
+    results = dict()
+    with TemporaryDirectory() as folder:
+        folder = Path(folder)
+
+        # Parsed workbooks are cached, so the first parse run is the cold
+        # read and the rest come from the cache. Keep that cache with the
+        # fixtures rather than the repo's.
+        os.environ['CHARTS_WORKBOOK_CACHE'] = str(folder / '.workbook-cache')
+
+        start = perf_counter()
+        data = case.prepare(folder, scale)
+        results['fixture_seconds'] = perf_counter() - start
+        results['fixture_bytes'] = sum(
+            f.stat().st_size for f in folder.iterdir() if f.is_file()
+        )
+
+        data, results['parse'] = time_stage(case.parse, data, repeat)
+        data, results['transform'] = time_stage(case.transform, data, repeat)
+        _, results['render'] = time_stage(case.render, data, repeat, folder)
+
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def versions():
+    found = dict()
+    for name in ('numpy', 'pandas', 'matplotlib', 'seaborn', 'bs4', 'PIL'):
+        try:
+            module = __import__(name)
+        except ImportError:
+            continue
+        found[name] = getattr(module, '__version__', None)
+    return found
+
+
+def print_results(results):
+    print(f"{'case':<18}" + ''.join(f'{s:>12}' for s in STAGES))
+    for name, stages in results.items():
+        if 'skipped' in stages or 'error' in stages:
+            print(f"{name:<18}  {stages.get('skipped') or stages['error']}")
+            continue
+        print(
+            f'{name:<18}'
+            + ''.join(f"{stages[s]['best'] * 1000:>10.1f}ms" for s in STAGES)
+        )
+
+
+def compare(results, baseline, threshold):
+    # Best-of-n against best-of-n, which is the least noisy figure we have
+    regressions = []
+    print(f"\n{'case':<18}" + ''.join(f'{s:>12}' for s in STAGES))
+    for name, stages in results.items():
+        before = baseline.get(name, dict())
+        if not all(s in stages and s in before for s in STAGES):
+            continue
+
+        row = f'{name:<18}'
+        for stage in STAGES:
+            ratio = stages[stage]['best'] / before[stage]['best']
+            flag = '!' if ratio > threshold else ' '
+            row += f'{ratio:>10.2f}x{flag}'
+            if ratio > threshold:
+                regressions.append((name, stage, ratio))
+        print(row)
+
+    for name, stage, ratio in regressions:
+        print(f'Regression: {name} {stage} is {ratio:.2f}x slower')
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(
+        description='Time the parse, transform and render stages of every '
+                    'chart script on synthetic data'
+    )
+    parser.add_argument(
+        'cases', nargs='*', metavar='case',
+        help=f'Cases to run (default: all of {", ".join(CASES)})'
+    )
+    parser.add_argument(
+        '--scale', type=int, default=1,
+        help='Multiplies the size of every fixture'
+    )
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument(
+        '--output', help='Write the results here as JSON, to compare later'
+    )
+    parser.add_argument(
+        '--compare', metavar='BASELINE',
+        help='Results from an earlier run to compare against'
+    )
+    parser.add_argument(
+        '--threshold', type=float, default=1.2,
+        help='Slowdown (as a ratio of best times) counted as a regression'
+    )
+    args = parser.parse_args()
+
+    unknown = set(args.cases) - set(CASES)
+    if unknown:
+        parser.error(f'unknown cases: {", ".join(sorted(unknown))}')
+
+    # Missing fonts and old API warnings would drown out the results
+    logging.getLogger('matplotlib.font_manager').setLevel(logging.ERROR)
+    warnings.simplefilter('ignore')
+
+    results = dict()
+    with no_network():
+        for name in args.cases or CASES:
+            print(f'Running {name}...', file=sys.stderr)
+            try:
+                results[name] = run_case(name, args.scale, args.repeat)
+            except Exception as e:
+                traceback.print_exc()
+                results[name] = {'error': repr(e)}
+
+    print_results(results)
+
+    if args.output:
+        folder = os.path.dirname(args.output)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump({
+                'meta': {
+                    'revision': git_revision(), 'scale': args.scale,
+                    'repeat': args.repeat, 'python': platform.python_version(),
+                    'platform': platform.platform(), 'versions': versions(),
+                },
+                'results': results,
+            }, f, indent=1)
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        if baseline['meta']['scale'] != args.scale:
+            print('Warning: baseline was run at a different scale')
+        if compare(results, baseline['results'], args.threshold):
+            sys.exit(1)
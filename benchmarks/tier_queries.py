@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from argparse import ArgumentParser
+from pathlib import Path
+import sys
+from time import perf_counter
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'football' / 'league_standings'))
+from benchmarks import fixtures  # noqa: E402
+from tier_matrix import TierMatrix  # noqa: E402
+
+
+# Time the league tier queries on the team x tier matrix, against the pandas
+# groupby/nlargest versions draw_graphs.py used to run on the Tier Seasons
+# table. Both answer the same questions, so their answers are compared too.
+def pandas_queries(df):
+    outsiders = df[df['Highest Level'].ne(1)]
+    every_tier = df.groupby('Team')['Tier'].nunique().eq(4)
+    return {
+        'outsiders': outsiders.groupby('Team')
+                              .agg({'Total Seasons': 'first'})
+                              .nlargest(11, 'Total Seasons')['Total Seasons'],
+        'nearly men': outsiders[outsiders['Numeric Level'].eq(2)]
+                               .set_index('Team')['Seasons']
+                               .nlargest(11),
+        'most in tier III': df[df['Tier'].eq('III')]
+                              .set_index('Team')['Seasons']
+                              .nlargest(11),
+        'every tier': df[df['Team'].isin(every_tier[every_tier].index)]
+                        .groupby('Team')['Total Seasons'].first()
+                        .nlargest(11),
+    }
+
+
+def matrix_queries(seasons):
+    outsiders = seasons.never_played_in('I')
+    return {
+        'outsiders': seasons.top(seasons.totals, 11, where=outsiders),
+        'nearly men': seasons.most_seasons_in('II', 11, where=outsiders),
+        'most in tier III': seasons.most_seasons_in('III', 11),
+        'every tier': seasons.top(
+            seasons.totals, 11, where=seasons.every_tier()
+        ),
+    }
+
+
+def best_of(func, arg, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        result = func(arg)
+        timings.append(perf_counter() - start)
+    return min(timings), result
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(
+        description='Time the league tier queries on a synthetic table'
+    )
+    parser.add_argument('--teams', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=100)
+    args = parser.parse_args()
+
+    df = fixtures.tier_seasons(args.teams)
+    build, seasons = best_of(TierMatrix.from_frame, df, args.repeat)
+    print(f'{args.teams} teams, {len(df)} rows, matrix built in '
+          f'{build * 1000:.1f}ms')
+
+    pandas_time, expected = best_of(pandas_queries, df, args.repeat)
+    matrix_time, answers = best_of(matrix_queries, seasons, args.repeat)
+    print(f"{'all four queries':<20}{'pandas':>12}{'matrix':>12}")
+    print(f"{'':<20}{pandas_time * 1e6:>10.0f}us{matrix_time * 1e6:>10.0f}us")
+
+    # nlargest keeps the first of any ties, which is name order here too
+    for name, top in answers.items():
+        values = expected[name]
+        if (list(top.values) != list(values)
+                or list(top.teams) != list(values.index)):
+            print(f'Warning: {name} answers differ', file=sys.stderr)
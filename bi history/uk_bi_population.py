@@ -1,204 +1,258 @@
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
+import sys
 
-import matplotlib as mpl
-from matplotlib.colors import LinearSegmentedColormap
-import matplotlib.pyplot as plt
-import numpy as np
-import pandas as pd
-from PIL import Image
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common.workbook import read_workbook  # noqa: E402
 
 
 CURRENT_DIR = Path(__file__).resolve().parent
+ONS_WORKBOOK = CURRENT_DIR / 'sexualorientation2018final05032020124027.xls'
 
-plt.rcParams['font.family'] = 'sans-serif'
-plt.rcParams['font.sans-serif'] = 'Bariol Serif'
-plt.rcParams['font.weight'] = 'regular'
-plt.rcParams['figure.dpi'] = 150
-plt.rcParams['savefig.dpi'] = 150
+SMALL_SIZE = 100
 
-# Set up colour maps
-flag_map = LinearSegmentedColormap.from_list(
-    name='bi_flag', colors=['#D60270', '#9B4F96', '#0038A8'], N=256
-)
-pink_map = LinearSegmentedColormap.from_list(
-    name='bi_pink', colors=['#000000', '#D60270', '#ffffff'], N=256
-)
 
-# Choose a dark pink variant for our text, and a light pink for our background
-bg_color = pink_map(0.95)
-sup_text_color = pink_map(0.1)
+def set_style():
+    import matplotlib.pyplot as plt
 
-logo = Image.open(CURRENT_DIR / 'bh_logo.jfif')
+    plt.rcParams['font.family'] = 'sans-serif'
+    plt.rcParams['font.sans-serif'] = 'Bariol Serif'
+    plt.rcParams['font.weight'] = 'regular'
+    plt.rcParams['figure.dpi'] = 150
+    plt.rcParams['savefig.dpi'] = 150
 
-SMALL_SIZE = 100
-small_logo = logo.resize((SMALL_SIZE, SMALL_SIZE))
-
-
-total_pop = pd.read_excel(
-    CURRENT_DIR / 'sexualorientation2018final05032020124027.xls', 
-    sheet_name=2, skiprows=3, header=[0,1], nrows=24
-)
-total_pop.columns = ['_'.join(c) for c in total_pop.columns]
-
-total_pop.rename(
-    columns={
-        total_pop.columns[0]: 'Year', 
-        total_pop.columns[1]: 'Reported Sexual Identity'
-    }, 
-    inplace=True
-)
-
-total_pop['Year'] = total_pop['Year'].ffill().astype(int)
-# Population given in thousands
-total_pop['Total Population'] = (
-    total_pop['Male_Estimate'] + total_pop['Female_Estimate']
-) * 1000
-
-bi_pop = total_pop[total_pop['Reported Sexual Identity'].eq('Bisexual')]
-
-age_pop = pd.read_excel(
-    CURRENT_DIR / 'sexualorientation2018final05032020124027.xls', 
-    sheet_name=3, skiprows=3, header=[0,1], nrows=24
-)
-age_pop.columns = ['_'.join(c) for c in age_pop.columns]
-
-age_pop.rename(
-    columns={
-        age_pop.columns[0]: 'Year', age_pop.columns[1]: 'Reported Sexual Identity'}
-    , 
-    inplace=True
+
+@lru_cache()
+def palette():
+    from matplotlib.colors import LinearSegmentedColormap
+
+    # Set up colour maps
+    flag_map = LinearSegmentedColormap.from_list(
+        name='bi_flag', colors=['#D60270', '#9B4F96', '#0038A8'], N=256
+    )
+    pink_map = LinearSegmentedColormap.from_list(
+        name='bi_pink', colors=['#000000', '#D60270', '#ffffff'], N=256
     )
 
-age_pop['Year'] = age_pop['Year'].ffill().astype(int)
+    # Choose a dark pink variant for our text, and a light pink for our background
+    bg_color = pink_map(0.95)
+    sup_text_color = pink_map(0.1)
 
-bi_ages = age_pop[age_pop['Reported Sexual Identity'].eq('Bisexual')]\
-                 .melt(id_vars=['Year', 'Reported Sexual Identity'], 
-                       var_name='Age Group', value_name='Population')
+    return flag_map, bg_color, sup_text_color
 
-# Filter to just the population estimates
-bi_ages = bi_ages[bi_ages['Age Group'].str.contains('Estimate')]
 
-# Get just the age group out
-bi_ages['Age Group'] = bi_ages['Age Group'].str.split('_', expand=True).loc[:,0]
+def load_logo(path=CURRENT_DIR / 'bh_logo.jfif'):
+    from PIL import Image
 
-# Again - population in thousands
-bi_ages['Population'] *= 1000
+    logo = Image.open(path)
+    return logo.resize((SMALL_SIZE, SMALL_SIZE))
 
-# Get latest year
-bi_latest = bi_ages[bi_ages['Year'].eq(bi_ages['Year'].max())]
 
-# Add extra description to the first group
-bi_latest['Age Group']  = bi_latest['Age Group'].replace({'16-24': '16-24 years old'})
+def read_sheet(sheet_name, path=ONS_WORKBOOK):
+    # A list of sheets gives a dict of frames, read in one go
+    return read_workbook(
+        path, sheet_name=sheet_name, skiprows=3, header=[0,1], nrows=24
+    )
 
-output_folder = CURRENT_DIR / 'Graphs'
-output_folder.mkdir(exist_ok=True)
 
-# First, plot the yearly totals
-fig, ax = plt.subplots(figsize=(8,8))
+def tidy_sheet(sheet):
+    sheet = sheet.copy()
+    sheet.columns = ['_'.join(c) for c in sheet.columns]
 
-years = bi_pop['Year']
-num_years = len(years)
+    sheet.rename(
+        columns={
+            sheet.columns[0]: 'Year',
+            sheet.columns[1]: 'Reported Sexual Identity'
+        },
+        inplace=True
+    )
 
-props = np.arange(0, 1+1/num_years, 1/num_years)
+    sheet['Year'] = sheet['Year'].ffill().astype(int)
+    return sheet
 
-population = bi_pop['Total Population']
 
-rects = ax.bar(x=years, height=population, color=flag_map(props))
+def bi_totals(total_pop):
+    total_pop = tidy_sheet(total_pop)
 
-# Add labels
-for year, r in zip(years, rects):
-    bar_mid = r.get_x() + r.get_width()/2
-    height = r.get_height()
-    ax.annotate(
-        s=year, xy=(bar_mid, 0), 
-        ha='center', va='baseline', 
-        xytext=(0, 10), textcoords='offset points', 
-        c='white', weight='bold', size=22
+    # Population given in thousands
+    total_pop['Total Population'] = (
+        total_pop['Male_Estimate'] + total_pop['Female_Estimate']
+    ) * 1000
+
+    return total_pop[total_pop['Reported Sexual Identity'].eq('Bisexual')]
+
+
+def bi_latest_ages(age_pop):
+    age_pop = tidy_sheet(age_pop)
+
+    bi_ages = age_pop[age_pop['Reported Sexual Identity'].eq('Bisexual')]\
+                     .melt(id_vars=['Year', 'Reported Sexual Identity'],
+                           var_name='Age Group', value_name='Population')
+
+    # Filter to just the population estimates
+    bi_ages = bi_ages[bi_ages['Age Group'].str.contains('Estimate')]
+
+    # Get just the age group out
+    bi_ages['Age Group'] = bi_ages['Age Group'].str.split('_', expand=True).loc[:,0]
+
+    # Again - population in thousands
+    bi_ages['Population'] *= 1000
+
+    # Get latest year
+    bi_latest = bi_ages[bi_ages['Year'].eq(bi_ages['Year'].max())]
+
+    # Add extra description to the first group
+    bi_latest['Age Group']  = bi_latest['Age Group'].replace({'16-24': '16-24 years old'})
+    return bi_latest
+
+
+def draw_totals(bi_pop, output_path, small_logo=None):
+    import matplotlib.pyplot as plt
+    import numpy as np
+    set_style()
+    flag_map, bg_color, sup_text_color = palette()
+
+    # First, plot the yearly totals
+    fig, ax = plt.subplots(figsize=(8,8))
+
+    years = bi_pop['Year']
+    num_years = len(years)
+
+    props = np.arange(0, 1+1/num_years, 1/num_years)
+
+    population = bi_pop['Total Population']
+
+    rects = ax.bar(x=years, height=population, color=flag_map(props))
+
+    # Add labels
+    for year, r in zip(years, rects):
+        bar_mid = r.get_x() + r.get_width()/2
+        height = r.get_height()
+        ax.annotate(
+            text=year, xy=(bar_mid, 0),
+            ha='center', va='baseline',
+            xytext=(0, 10), textcoords='offset points',
+            c='white', weight='bold', size=22
+        )
+
+        ax.annotate(
+            text=f'{height/1000:.0f}k', xy=(bar_mid, height),
+            ha='center', va='baseline',
+            xytext=(0, 10), textcoords='offset points',
+            c=r.get_facecolor(), weight='bold', size=22
+        )
+
+    ax.axis('off')
+    ax.margins(x=0)
+
+    fig.set_facecolor(bg_color)
+    fig.subplots_adjust(left=0.05, right=0.95, bottom=0.1, top=0.75)
+
+    fig.suptitle(
+        'Estimated UK\nBisexual Population', size=45, c=sup_text_color,
+        style='italic', y=0.95, va='top', fontname='Salome'
     )
 
+    source_text='''Source: ons.gov.uk/peoplepopulationandcommunity/culturalidentity/sexuality/datasets/sexualidentityuk
+Released 2020-03-06, retrieved 2020-07-01. Estimates considered "reasonably precise".'''
+
     ax.annotate(
-        s=f'{height/1000:.0f}k', xy=(bar_mid, height), 
-        ha='center', va='baseline', 
-        xytext=(0, 10), textcoords='offset points', 
-        c=r.get_facecolor(), weight='bold', size=22
+        text=source_text,
+        xy=(0, .05), xycoords=('axes points', 'figure fraction'),
+        ha='left', va='bottom',
+        size=10, c=sup_text_color, weight='bold'
     )
 
-ax.axis('off')
-ax.margins(x=0)
+    # Add in the logo
+    if small_logo is not None:
+        fig.figimage(small_logo, xo=0, yo=fig.bbox.ymax-SMALL_SIZE)
 
-fig.set_facecolor(bg_color)
-fig.subplots_adjust(left=0.05, right=0.95, bottom=0.1, top=0.75)
+    plt.savefig(output_path, dpi=150, facecolor=bg_color)
+    plt.close(fig)
 
-fig.suptitle(
-    'Estimated UK\nBisexual Population', size=45, c=sup_text_color, 
-    style='italic', y=0.95, va='top', fontname='Salome'
-)
 
-source_text='''Source: ons.gov.uk/peoplepopulationandcommunity/culturalidentity/sexuality/datasets/sexualidentityuk
-Released 2020-03-06, retrieved 2020-07-01. Estimates considered "reasonably precise".'''
+def draw_age_groups(bi_latest, num_years, output_path, small_logo=None):
+    import matplotlib.pyplot as plt
+    import numpy as np
+    set_style()
+    flag_map, bg_color, sup_text_color = palette()
+
+    # Now do our population by year
+    fig, ax = plt.subplots(figsize=(8,8))
+
+    age_groups = bi_latest['Age Group']
 
-ax.annotate(
-    s=source_text, 
-    xy=(0, .05), xycoords=('axes points', 'figure fraction'), 
-    ha='left', va='bottom',
-    size=10, c=sup_text_color, weight='bold'
-)
+    props = np.arange(0, 1+1/num_years, 1/num_years)
 
-# Add in the logo
-fig.figimage(small_logo, xo=0, yo=fig.bbox.ymax-SMALL_SIZE)
+    population = bi_latest['Population']
 
-plt.savefig(output_folder / 'total population.png', dpi=150, facecolor=bg_color)
+    rects = ax.barh(y=age_groups, width=population, color=flag_map(props))
 
-# Now do our population by year
-fig, ax = plt.subplots(figsize=(8,8))
+    for grp, r in zip(age_groups, rects):
+        bar_mid = r.get_y() + r.get_height()/2
+        width = r.get_width()
+        ax.annotate(
+            text=grp, xy=(0, bar_mid),
+            ha='left', va='center',
+            xytext=(10, 0), textcoords='offset points',
+            c='white', weight='bold', size=20
+        )
+
+        ax.annotate(
+                text=f'{width/1000:.0f}k', xy=(width, bar_mid),
+                ha='left', va='center',
+                xytext=(10, 0), textcoords='offset points',
+                c=r.get_facecolor(), weight='bold', size=20
+            )
 
-age_groups = bi_latest['Age Group']
-num_years = len(years)
+    ax.axis('off')
+    ax.margins(x=0, y=0)
 
-props = np.arange(0, 1+1/num_years, 1/num_years)
+    fig.set_facecolor(bg_color)
+    fig.subplots_adjust(left=0.05, right=0.85, bottom=0.1, top=0.75)
 
-population = bi_latest['Population']
+    fig.suptitle('2018 Estimated UK\nBisexual Population', fontname='Salome', size=45, c=sup_text_color, style='italic', y=0.95, va='top')
 
-rects = ax.barh(y=age_groups, width=population, color=flag_map(props))
+    source_text='''Source: ons.gov.uk/peoplepopulationandcommunity/culturalidentity/sexuality/datasets/sexualidentityuk
+Released 2020-03-06, retrieved 2020-07-01. Estimates considered "acceptable" or higher'''
 
-for grp, r in zip(age_groups, rects):
-    bar_mid = r.get_y() + r.get_height()/2
-    width = r.get_width()
     ax.annotate(
-        s=grp, xy=(0, bar_mid), 
-        ha='left', va='center', 
-        xytext=(10, 0), textcoords='offset points', 
-        c='white', weight='bold', size=20
+        text=source_text,
+        xy=(0, .05), xycoords=('axes points', 'figure fraction'), ha='left', va='bottom',
+        size=10, c=sup_text_color, weight='bold'
     )
 
-    ax.annotate(
-            s=f'{width/1000:.0f}k', xy=(width, bar_mid), 
-            ha='left', va='center', 
-            xytext=(10, 0), textcoords='offset points', 
-            c=r.get_facecolor(), weight='bold', size=20
-        )
+    ax.invert_yaxis()
 
-ax.axis('off')
-ax.margins(x=0, y=0)
+    if small_logo is not None:
+        fig.figimage(small_logo, xo=0, yo=fig.bbox.ymax-SMALL_SIZE)
 
-fig.set_facecolor(bg_color)
-fig.subplots_adjust(left=0.05, right=0.85, bottom=0.1, top=0.75)
+    plt.savefig(output_path, dpi=150, facecolor=bg_color)
+    plt.close(fig)
 
-fig.suptitle('2018 Estimated UK\nBisexual Population', fontname='Salome', size=45, c=sup_text_color, style='italic', y=0.95, va='top')
 
+def main(draw=True):
+    sheets = read_sheet([2, 3])
+    bi_pop = bi_totals(sheets[2])
+    bi_latest = bi_latest_ages(sheets[3])
+    if not draw:
+        print(bi_pop[['Year', 'Total Population']], bi_latest, sep='\n\n')
+        return
 
-source_text='''Source: ons.gov.uk/peoplepopulationandcommunity/culturalidentity/sexuality/datasets/sexualidentityuk
-Released 2020-03-06, retrieved 2020-07-01. Estimates considered "acceptable" or higher'''
+    small_logo = load_logo()
 
-ax.annotate(
-    s=source_text, 
-    xy=(0, .05), xycoords=('axes points', 'figure fraction'), ha='left', va='bottom',
-    size=10, c=sup_text_color, weight='bold'
-)
+    output_folder = CURRENT_DIR / 'Graphs'
+    output_folder.mkdir(exist_ok=True)
 
-ax.invert_yaxis()
+    draw_totals(bi_pop, output_folder / 'total population.png', small_logo)
+
+    # The colours for the age groups are spread as they were for the years
+    draw_age_groups(
+        bi_latest, len(bi_pop), output_folder / f'2018 age groups.png',
+        small_logo
+    )
 
-fig.figimage(small_logo, xo=0, yo=fig.bbox.ymax-SMALL_SIZE)
 
-plt.savefig(output_folder / f'2018 age groups.png', dpi=150, facecolor=bg_color)
+if __name__ == '__main__':
+    main()
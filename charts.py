@@ -0,0 +1,252 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from argparse import ArgumentParser
+from collections import namedtuple
+from contextlib import contextmanager
+import importlib.util
+from inspect import signature
+import os
+from pathlib import Path
+import subprocess
+import sys
+from time import perf_counter
+
+
+# Only the standard library gets imported here. Each script imports its own
+# heavy libraries inside the functions that need them, so listing and checking
+# jobs never touches pandas or matplotlib.
+ROOT = Path(__file__).resolve().parent
+
+# data: files the data step reads, draw: files only needed to draw. update
+# steps rebuild a job's committed data from its original source, so only run
+# when asked to.
+Step = namedtuple(
+    'Step', 'script data draw network update',
+    defaults=((), (), False, False)
+)
+Job = namedtuple('Job', 'folder description steps subprocess', defaults=(False,))
+
+JOBS = {
+    'league-standings': Job(
+        'football/league_standings',
+        'Outsiders and Nearly Men from English league tier seasons',
+        [
+            Step('get_seasons.py', data=['Tiers_1617-1920.xlsx'],
+                 network=True, update=True),
+            Step('draw_graphs.py', data=['Data/Tier Seasons.csv']),
+        ]
+    ),
+    'champions': Job(
+        'football/big five champions',
+        "Most frequent champions in Europe's big five leagues",
+        [Step('champions.py', draw=['Badges'], network=True)]
+    ),
+    'goalscorers': Job(
+        'football/goalscorers',
+        'All-time top scorers in English league football',
+        [Step('scorers.py', data=['goalscorers.csv'],
+              draw=['mexcellent_3D.otf', 'mexcellent_rg.otf'])]
+    ),
+    'gig-calendar': Job(
+        'gig calendar/2019',
+        'Calendar of gigs in 2019',
+        [
+            Step('read_ics.py', data=['events.ics'], update=True),
+            Step('make_cal.py', data=['2019 gigs.csv']),
+        ]
+    ),
+    'bi-history': Job(
+        'bi history',
+        'Estimated UK bisexual population from ONS data',
+        [Step('uk_bi_population.py',
+              data=['sexualorientation2018final05032020124027.xls'],
+              draw=['bh_logo.jfif'])]
+    ),
+    'injuries': Job(
+        'nfl/injury data',
+        'NFL injuries per year',
+        [Step('yearly_totals.py', data=['InjuryData.xlsx'])]
+    ),
+    'halloween': Job(
+        'halloween',
+        'Halloween movie marathon timetable and heart rate',
+        [
+            Step('timetable.py', draw=['GROOVYGH.TTF']),
+            Step('heartrate.py', data=['2020-10-31'], draw=['GROOVYGH.TTF']),
+        ]
+    ),
+    'headliners': Job(
+        'music/download headliners',
+        'Repeat Download Festival main stage headliners',
+        [Step('headliner-repeats.py',
+              data=['download mainstage headliners.csv'])]
+    ),
+    'biffy-charts': Job(
+        'music/charts',
+        'Biffy Clyro UK chart positions',
+        [Step('biffy_charts.py', network=True)]
+    ),
+    # Parses and draws in a process pool, so it gets a fresh interpreter of
+    # its own. Anything after the job name is passed straight through.
+    'weather': Job(
+        'weather/interactive_map',
+        'Daytime temperature ridge plots for every MIDAS site',
+        [Step('graph_all_air_temps.py', draw=['credentials.json'],
+              network=True)],
+        subprocess=True
+    ),
+}
+
+
+def job_steps(job, update=False):
+    return [step for step in job.steps if update or not step.update]
+
+
+def missing_inputs(job, draw=True, update=False):
+    folder = ROOT / job.folder
+    missing = []
+    for step in job_steps(job, update):
+        needed = list(step.data) + (list(step.draw) if draw else [])
+        missing.extend(
+            (step.script, name) for name in needed
+            if not (folder / name).exists()
+        )
+    return missing
+
+
+@contextmanager
+def working_directory(folder):
+    # The scripts read and write relative to their own folders
+    previous = os.getcwd()
+    os.chdir(folder)
+    sys.path.insert(0, str(folder))
+    try:
+        yield
+    finally:
+        sys.path.remove(str(folder))
+        os.chdir(previous)
+
+
+def load_script(path):
+    name = 'charts_' + path.stem.replace('-', '_')
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_job(name, draw=True, update=False, offline=False, extra=()):
+    job = JOBS[name]
+    folder = ROOT / job.folder
+
+    if offline:
+        # Read by common.fetch in this process. Subprocess jobs have a
+        # command line of their own, so they're told with --offline.
+        os.environ['CHARTS_OFFLINE'] = '1'
+        if job.subprocess:
+            extra = ['--offline', *extra]
+
+    for step in job_steps(job, update):
+        path = folder / step.script
+        print(f'{name}: {step.script}', file=sys.stderr)
+        start = perf_counter()
+
+        if job.subprocess:
+            subprocess.run(
+                [sys.executable, str(path), *extra], cwd=folder, check=True
+            )
+        else:
+            with working_directory(folder):
+                main = load_script(path).main
+                # Scripts that can rebuild their own data take update too
+                if update and 'update' in signature(main).parameters:
+                    main(draw=draw, update=True)
+                else:
+                    main(draw=draw)
+
+        print(
+            f'{name}: {step.script} took {perf_counter() - start:.2f}s',
+            file=sys.stderr
+        )
+
+
+def list_jobs():
+    width = max(map(len, JOBS))
+    for name, job in JOBS.items():
+        flags = ' (network)' if any(s.network for s in job_steps(job)) else ''
+        print(f'{name:<{width}}  {job.description}{flags}')
+
+
+def check_jobs(names, draw=True, update=False):
+    problems = 0
+    for name in names:
+        missing = missing_inputs(JOBS[name], draw, update)
+        if not missing:
+            print(f'{name}: ok')
+        for script, input_name in missing:
+            print(f'{name}: {script} is missing {input_name}')
+        problems += len(missing)
+    return problems
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Run any of the analyses in this repo')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    commands.add_parser('list', help='List the jobs')
+
+    check = commands.add_parser(
+        'check', help="Report any inputs the jobs need that aren't on disk"
+    )
+    run = commands.add_parser('run', help='Run a job')
+
+    for command in (check, run):
+        command.add_argument(
+            '--data-only', action='store_true',
+            help="Only run the data steps, printing the results instead of "
+                 "drawing"
+        )
+        command.add_argument(
+            '--update', action='store_true',
+            help="Also rebuild the job's saved data from its original source"
+        )
+
+    check.add_argument('jobs', nargs='*', metavar='job')
+    run.add_argument(
+        '--offline', action='store_true',
+        help="Only use pages already in the HTTP cache, failing if one isn't. "
+             "The weather job only draws what it already has cached."
+    )
+    run.add_argument('job', choices=JOBS)
+    # Anything else on a run command line is passed through to jobs with
+    # their own command line (weather), so our options can go either side of
+    # the job name
+    args, extra = parser.parse_known_args()
+    if extra and args.command != 'run':
+        parser.error(f'unrecognized arguments: {" ".join(extra)}')
+
+    if args.command == 'list':
+        list_jobs()
+    elif args.command == 'check':
+        unknown = set(args.jobs) - set(JOBS)
+        if unknown:
+            parser.error(f'unknown jobs: {", ".join(sorted(unknown))}')
+        if check_jobs(args.jobs or JOBS, not args.data_only, args.update):
+            sys.exit(1)
+    else:
+        job = JOBS[args.job]
+        if job.subprocess and args.data_only:
+            parser.error(f'{args.job} has no separate data step')
+        if extra and not job.subprocess:
+            parser.error(f'{args.job} takes no extra arguments')
+        try:
+            run_job(
+                args.job, not args.data_only, args.update, args.offline, extra
+            )
+        except subprocess.CalledProcessError as error:
+            # The job has already reported what went wrong
+            print(
+                f'{args.job}: exited with code {error.returncode}',
+                file=sys.stderr
+            )
+            sys.exit(error.returncode)
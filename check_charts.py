@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Checks that charts.py hands its own options on to the jobs it runs in a
+# subprocess: "run weather --offline" must draw only from the weather cache
+# and never try the FTP, and a job that fails should exit with its own code.
+# Everything the job writes goes in a temporary folder, and credentials it
+# would need to go online don't exist there. Exits non-zero if any check fails.
+from pathlib import Path
+import subprocess
+import sys
+from tempfile import TemporaryDirectory
+
+
+ROOT = Path(__file__).resolve().parent
+
+
+def run_charts(*args):
+    result = subprocess.run(
+        [sys.executable, str(ROOT / 'charts.py'), *args],
+        capture_output=True, text=True
+    )
+    return result.returncode, result.stdout + result.stderr
+
+
+def weather_args(folder):
+    # Keep the job's cache, manifest, report and listing out of the repo
+    return [
+        '--cache', str(folder / 'Cache'),
+        '--manifest', str(folder / 'manifest.json'),
+        '--report', str(folder / 'rejected.jsonl'),
+        '--listing', str(folder / 'listing.jsonl'),
+        '--credentials', str(folder / 'credentials.json'),
+        '--jobs', '1',
+    ]
+
+
+def check(name, ok, output):
+    print(f'{name}  {"ok" if ok else "FAIL"}')
+    if not ok:
+        print(output)
+    return ok
+
+
+if __name__ == '__main__':
+    with TemporaryDirectory() as folder:
+        folder = Path(folder)
+        results = []
+
+        # With an empty cache there's nothing to draw, so an offline run
+        # finishes without error. Online, it would fail on the credentials.
+        for args in (
+                ['run', '--offline', 'weather'],
+                ['run', 'weather', '--offline']):
+            code, output = run_charts(*args, *weather_args(folder))
+            results.append(check(' '.join(args), code == 0, output))
+
+        # The weather script refuses --offline without its cache, so this
+        # only fails if the flag got through. charts.py should pass on the
+        # job's exit code rather than a traceback of its own.
+        code, output = run_charts(
+            'run', 'weather', '--offline', '--no-cache', *weather_args(folder)
+        )
+        results.append(check(
+            'run weather --offline --no-cache',
+            code == 2 and '--offline needs the cache' in output
+            and 'weather: exited with code 2' in output
+            and 'Traceback' not in output, output
+        ))
+
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,170 @@
+from collections import Counter
+from hashlib import sha256
+import json
+import os
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from threading import Lock
+from time import time
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+import warnings
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Both can be set from the environment, so scripts run by charts.py (or by
+# hand) pick them up without any plumbing
+CACHE_DIR = Path(os.environ.get('CHARTS_HTTP_CACHE', ROOT / '.http-cache'))
+
+# Pages younger than this are used without asking the server. Older ones are
+# revalidated with their ETag/Last-Modified, which is cheap when they haven't
+# changed.
+MAX_AGE = 24 * 60 * 60
+
+
+def offline_mode():
+    return os.environ.get('CHARTS_OFFLINE', '') not in ('', '0')
+
+
+class NotCached(LookupError):
+    # Raised in offline mode for a page we've never downloaded
+    def __init__(self, url):
+        super().__init__(f'{url} is not in the HTTP cache and we are offline')
+        self.url = url
+
+
+class HttpCache:
+    # Page bodies are stored once each under their SHA-256, so a page that
+    # hasn't changed (or two URLs serving the same thing) costs nothing extra.
+    # index.json maps each URL to its current body and the validators needed
+    # to revalidate it.
+    def __init__(self, folder=CACHE_DIR, max_age=MAX_AGE, offline=None,
+                 timeout=30):
+        self.folder = Path(folder)
+        self.index_path = self.folder / 'index.json'
+        self.max_age = max_age
+        self.offline = offline_mode() if offline is None else offline
+        self.timeout = timeout
+        self.stats = Counter()
+
+        self._lock = Lock()
+        self.index = self._read_index()
+
+    def _read_index(self):
+        try:
+            with open(self.index_path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return dict()
+
+    def _write_atomic(self, path, data):
+        # Write alongside and rename over, so a crash or a concurrent reader
+        # never sees half a file
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with NamedTemporaryFile(dir=path.parent, delete=False) as f:
+            f.write(data)
+        os.replace(f.name, path)
+
+    def _blob_path(self, digest):
+        return self.folder / 'objects' / digest[:2] / digest
+
+    def _read_blob(self, entry):
+        with open(self._blob_path(entry['sha256']), 'rb') as f:
+            return f.read()
+
+    def _store(self, url, body, headers):
+        digest = sha256(body).hexdigest()
+        blob = self._blob_path(digest)
+        if not blob.is_file():
+            self._write_atomic(blob, body)
+
+        entry = {
+            'sha256': digest,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'charset': headers.get_content_charset(),
+            'checked': time(),
+        }
+        self._update(url, entry)
+        return entry
+
+    def _update(self, url, entry):
+        with self._lock:
+            # Another process may have cached other pages since we started
+            index = self._read_index()
+            index[url] = entry
+            self.index = index
+            self._write_atomic(
+                self.index_path, json.dumps(index, indent=1).encode('utf-8')
+            )
+
+    def entry(self, url):
+        entry = self.index.get(url)
+        if entry and self._blob_path(entry['sha256']).is_file():
+            return entry
+
+    def get(self, url):
+        entry = self.entry(url)
+
+        if self.offline:
+            if entry is None:
+                raise NotCached(url)
+            self.stats['cached'] += 1
+            return self._read_blob(entry)
+
+        if entry and time() - entry['checked'] < self.max_age:
+            self.stats['cached'] += 1
+            return self._read_blob(entry)
+
+        headers = dict()
+        if entry and entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+
+        request = Request(url, headers=headers)
+        try:
+            with urlopen(request, timeout=self.timeout) as response:
+                body = response.read()
+                self._store(url, body, response.headers)
+                self.stats['downloaded'] += 1
+                return body
+        except HTTPError as e:
+            if e.code != 304 or entry is None:
+                raise
+            self._update(url, dict(entry, checked=time()))
+            self.stats['revalidated'] += 1
+            return self._read_blob(entry)
+        except URLError as e:
+            # Better an old copy than nothing
+            if entry is None:
+                raise
+            warnings.warn(f'Using cached copy of {url}: {e.reason}')
+            self.stats['stale'] += 1
+            return self._read_blob(entry)
+
+    def text(self, url, encoding=None):
+        body = self.get(url)
+        entry = self.entry(url) or dict()
+        return body.decode(encoding or entry.get('charset') or 'utf-8', 'replace')
+
+
+_default_cache = None
+_default_lock = Lock()
+
+
+def default_cache():
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = HttpCache()
+    return _default_cache
+
+
+def fetch(url):
+    return default_cache().get(url)
+
+
+def fetch_text(url, encoding=None):
+    return default_cache().text(url, encoding)
@@ -0,0 +1,91 @@
+from time import perf_counter
+
+import matplotlib
+matplotlib.use('Agg', force=True)
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # noqa: E402
+from matplotlib.figure import Figure  # noqa: E402
+
+
+# Templates are kept per process, so worker processes each build their own
+_templates = dict()
+
+
+class ChartTemplate:
+    # A figure and its axes, created directly on the Agg canvas so nothing
+    # here touches pyplot's global state. A template can be cleared and drawn
+    # on again, but clearing every axes with cla() costs about as much as
+    # building them, so get_template only keeps one when asked to.
+    def __init__(self, figsize, nrows=1, ncols=1, facecolor=None,
+                 **subplot_params):
+        self.figure = Figure(figsize=figsize, facecolor=facecolor)
+        FigureCanvasAgg(self.figure)
+
+        self.axes = self.figure.subplots(
+            nrows, ncols, squeeze=False, **subplot_params
+        )
+        self.ax = self.axes.flat[0]
+
+        # Remember the starting state so clear() can put it back
+        params = self.figure.subplotpars
+        self._subplotpars = {
+            name: getattr(params, name)
+            for name in ('left', 'right', 'bottom', 'top', 'wspace', 'hspace')
+        }
+        self._figure_facecolor = self.figure.get_facecolor()
+        self._axes_facecolors = [ax.get_facecolor() for ax in self.axes.flat]
+
+    def clear(self):
+        for ax, facecolor in zip(self.axes.flat, self._axes_facecolors):
+            ax.cla()
+            ax.set_axis_on()
+            ax.set_facecolor(facecolor)
+            for spine in ax.spines.values():
+                spine.set_visible(True)
+
+        # Figure-level artists (suptitles, figure text, figimages, legends).
+        # Removing a suptitle also frees the figure's slot for the next one.
+        figure = self.figure
+        for artist in [*figure.texts, *figure.images, *figure.legends]:
+            artist.remove()
+
+        figure.set_facecolor(self._figure_facecolor)
+        figure.subplots_adjust(**self._subplotpars)
+
+
+def get_template(name, reuse=False, **params):
+    # A template ready to draw one image on: a new one, or with reuse the one
+    # this process keeps for name and params, cleared
+    if not reuse:
+        return ChartTemplate(**params)
+
+    key = (name, tuple(sorted(params.items())))
+    if key not in _templates:
+        _templates[key] = ChartTemplate(**params)
+    else:
+        _templates[key].clear()
+    return _templates[key]
+
+
+def clear_templates():
+    _templates.clear()
+
+
+def render_many(jobs, draw, template, report=False):
+    # Draw and save a batch of images. jobs is an iterable of (output path,
+    # job) pairs; template() gives the template for each image (see
+    # get_template); draw(template, job) does the drawing and can return extra
+    # keyword arguments for savefig. Returns the time taken per image.
+    timings = []
+    for output_path, job in jobs:
+        start = perf_counter()
+
+        chart = template()
+        save_params = draw(chart, job) or dict()
+        chart.figure.savefig(output_path, **save_params)
+
+        elapsed = perf_counter() - start
+        timings.append((output_path, elapsed))
+        if report:
+            print(f'{elapsed:6.2f}s  {output_path}')
+
+    return timings
@@ -0,0 +1,168 @@
+from collections import namedtuple
+import re
+
+from common.scrape import (
+    declared_charset, decode, in_comment, pre_blocks, strip_tags
+)
+
+
+# Parsers for the plain-text tables on rsssf.com. Everything worth having is
+# in <pre> blocks, one record (or part of one) per line. pre_text pulls those
+# out of a page or a response, and each table parser runs one compiled,
+# line-anchored pattern over them in a single pass, carrying whatever state
+# the table needs from line to line, and yields typed records.
+
+TierSeasons = namedtuple('TierSeasons', 'team tier seasons')
+Champion = namedtuple('Champion', 'season team')
+Scorer = namedtuple('Scorer', 'rank name goals career clubs')
+
+# Whitespace that doesn't run on to the next line, for use inside [...]
+_WS = r' \t\f\v'
+
+_pre_open = re.compile(r'<pre\b[^>]*>', re.I)
+_pre_close = re.compile(r'</pre\s*>', re.I)
+
+
+def _stream(lines, blocks):
+    encoding = None
+    in_pre = False
+    block = -1
+    # The start of a comment that carries on past the end of its line
+    pending = ''
+
+    for line in lines:
+        if isinstance(line, bytes):
+            if encoding is None:
+                encoding = declared_charset(line)
+            try:
+                line = line.decode(encoding or 'utf-8')
+            except (LookupError, UnicodeDecodeError):
+                line = decode(line)
+        line = line.rstrip('\r\n')
+
+        while True:
+            if not in_pre:
+                opened = _pre_open.search(line)
+                if not opened:
+                    break
+                in_pre = True
+                block += 1
+                line = line[opened.end():]
+                continue
+
+            closed = _pre_close.search(line)
+            text = pending + (line if closed is None else line[:closed.start()])
+            if closed is None and in_comment(text):
+                # Hold the lines back until the comment ends, so it can be
+                # dropped whole
+                pending = text + '\n'
+                break
+            pending = ''
+
+            if blocks is None or block in blocks:
+                yield block, strip_tags(text)
+            if closed is None:
+                break
+            in_pre = False
+            line = line[closed.end():]
+
+
+def pre_text(source, blocks=None):
+    # Yield (block number, text) for the <pre> blocks, optionally only those
+    # numbered in blocks (counting from 0). A whole page (bytes or str) gives
+    # each block in one piece. Anything else is taken as an iterable of lines,
+    # like a response, and is read and yielded a line at a time.
+    if not isinstance(source, (bytes, str)):
+        yield from _stream(source, blocks)
+        return
+
+    for block, text in enumerate(pre_blocks(source)):
+        if blocks is None or block in blocks:
+            if '\r' in text:
+                text = '\n'.join(text.splitlines())
+            yield block, text
+
+
+def _texts(chunks):
+    # Parsers take pre_text's output or plain strings
+    for chunk in chunks:
+        yield chunk[1] if isinstance(chunk, tuple) else chunk
+
+
+# engall.html: a team line ("Arsenal (London)") followed by one line per tier
+# it has played in ("  1904-2020  I     104"). A team name only counts at the
+# start of a line, and each alternative eats the rest of its line, so there's
+# at most one match per line. A tier just needs a digit or a space in front
+# of it; matching the whole run of them first only costs backtracking.
+_tiers = re.compile(
+    rf"^(?P<team>[\w{_WS}']+)\(.*"
+    rf"|[\d{_WS}](?P<tier>I{{1,3}}|IV)[{_WS}]+(?P<seasons>\d+).*",
+    re.M
+)
+
+
+def league_tiers(chunks):
+    team = None
+    for text in _texts(chunks):
+        for name, tier, seasons in map(re.Match.groups, _tiers.finditer(text)):
+            if name is not None:
+                team = name.strip()
+            elif team is not None:
+                yield TierSeasons(team, tier, int(seasons))
+
+
+# xxxchamp.html: "1999/00  Manchester United", sometimes with a marker or a
+# D/Q/T note between the season and the team
+_champion = re.compile(
+    rf'^(?P<season>[\d\/]+)[{_WS}\-\*]+(?:[DQT][{_WS}])?'
+    rf'(?P<team>[A-Za-z][A-Za-z{_WS}\.\-üéñ]+)',
+    re.M
+)
+
+
+def champions(chunks):
+    for text in _texts(chunks):
+        for match in _champion.finditer(text):
+            yield Champion(*match.group('season', 'team'))
+
+
+# engtops-allt.html: a ranked player line with goals, career span and clubs.
+# Long club lists carry on, indented, on the following lines, and any other
+# line ends the record.
+_scorer = re.compile(
+    rf'^(?:[{_WS}]*(?:(?P<rank>\d+)[\.\)]?[{_WS}]+)?'
+    rf'(?P<name>\S.*?)[{_WS}]{{2,}}(?P<goals>\d+)[{_WS}]+'
+    rf'(?P<career>\d{{4}}[{_WS}]*-[{_WS}]*\d{{2,4}})[{_WS}]*(?P<clubs>.*)'
+    rf'|[{_WS}]{{4,}}(?P<more>\S.*)'
+    rf'|(?P<other>.*))$',
+    re.M
+)
+
+
+def _scorer_record(match):
+    rank = match.group('rank')
+    return Scorer(
+        int(rank) if rank else None, match.group('name').strip(),
+        int(match.group('goals')), re.sub(r'\s', '', match.group('career')),
+        match.group('clubs').strip(' ,()')
+    )
+
+
+def scorers(chunks):
+    current = None
+    for text in _texts(chunks):
+        for match in _scorer.finditer(text):
+            kind = match.lastgroup
+            if kind == 'more' and current is not None:
+                more = match.group('more').strip(' ,()')
+                current = current._replace(
+                    clubs=', '.join(filter(None, (current.clubs, more)))
+                )
+                continue
+
+            if current is not None:
+                yield current
+            current = _scorer_record(match) if kind == 'clubs' else None
+
+    if current is not None:
+        yield current
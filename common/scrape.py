@@ -0,0 +1,78 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import html
+import os
+import re
+
+
+# RSSSF pages keep everything worth having in <pre> blocks, so for those we
+# don't need a DOM at all: find the blocks, drop any tags inside them (links,
+# bold) and unescape what's left. That's what BeautifulSoup's .text gives,
+# without building the tree for the rest of the page first.
+_pre = re.compile(r'<pre\b[^>]*>(.*?)</pre\s*>', re.I | re.S)
+_comment = re.compile(r'<!--.*?-->', re.S)
+_tag = re.compile(r'<[^>]*>')
+_charset = re.compile(rb'<meta[^>]+charset=["\']?([\w\-]+)', re.I)
+
+
+def declared_charset(data):
+    # The charset named in a <meta> tag, if data has one
+    declared = _charset.search(data)
+    return declared.group(1).decode('ascii') if declared else None
+
+
+def strip_tags(text):
+    # Drop comments and tags and unescape what's left, skipping the work on
+    # text with nothing to drop
+    if '<' in text:
+        text = _tag.sub('', _comment.sub('', text))
+    if '&' in text:
+        text = html.unescape(text)
+    return text
+
+
+def in_comment(text):
+    # Whether text ends part way through an HTML comment
+    return text.rfind('<!--') > text.rfind('-->')
+
+
+def decode(page):
+    # Roughly what BeautifulSoup does: trust a declared charset, then UTF-8,
+    # then fall back to Windows-1252, which older pages almost always are
+    charset = declared_charset(page[:4096])
+    if charset:
+        try:
+            return page.decode(charset)
+        except (LookupError, UnicodeDecodeError):
+            pass
+    try:
+        return page.decode('utf-8')
+    except UnicodeDecodeError:
+        return page.decode('windows-1252', 'replace')
+
+
+def pre_blocks(page, parser='fast'):
+    # The text of every <pre> block on a page, in order. parser='bs4' goes
+    # through BeautifulSoup instead, for comparison or odd markup.
+    if parser == 'bs4':
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(page, features='html.parser')
+        return [section.text for section in soup.find_all('pre')]
+
+    if isinstance(page, bytes):
+        page = decode(page)
+    return [strip_tags(block) for block in _pre.findall(page)]
+
+
+def pre_blocks_many(pages, parser='fast', jobs=None):
+    # pre_blocks for several pages, spread over worker processes. Starting the
+    # workers costs more than the fast extractor saves on a handful of pages,
+    # so jobs=1 (or a single page) keeps everything in this process.
+    pages = list(pages)
+    jobs = min(jobs or os.cpu_count() or 1, len(pages))
+    if jobs <= 1:
+        return [pre_blocks(page, parser) for page in pages]
+
+    with ProcessPoolExecutor(jobs) as pool:
+        return list(pool.map(partial(pre_blocks, parser=parser), pages))
@@ -0,0 +1,151 @@
+from hashlib import sha256
+import json
+import os
+from pathlib import Path
+import pickle
+from tempfile import NamedTemporaryFile
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Sheets are parsed from a workbook once, then kept here keyed on a hash of the
+# workbook's contents and the read_excel options, so editing the workbook or
+# reading it differently can't give back stale frames
+DEFAULT_CACHE = ROOT / '.workbook-cache'
+
+
+def cache_folder():
+    # Looked up on every call, so the benchmarks can point it somewhere
+    # temporary
+    return Path(os.environ.get('CHARTS_WORKBOOK_CACHE', DEFAULT_CACHE))
+
+
+def file_digest(path, chunk_size=1 << 20):
+    digest = sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_atomic(path, write):
+    with NamedTemporaryFile(dir=path.parent, delete=False) as f:
+        try:
+            write(f)
+        except BaseException:
+            f.close()
+            os.unlink(f.name)
+            raise
+    os.replace(f.name, path)
+
+
+class SheetCache:
+    # One folder per workbook version and set of options, with a manifest of
+    # the sheets converted so far. Frames go to Parquet where that round-trips
+    # exactly, and to a pickle otherwise (mixed-type or numeric headers, which
+    # the ONS tables have).
+    def __init__(self, path, options, folder=None):
+        key = json.dumps(options, sort_keys=True, default=str)
+        self.folder = (
+            Path(folder or cache_folder()) / file_digest(path)[:24]
+            / sha256(key.encode('utf-8')).hexdigest()[:16]
+        )
+        self.manifest_path = self.folder / 'manifest.json'
+        try:
+            with open(self.manifest_path, 'r') as f:
+                self.manifest = json.load(f)
+        except FileNotFoundError:
+            self.manifest = {'sheets': dict(), 'names': None}
+
+    @staticmethod
+    def key(sheet):
+        # Sheets can be asked for by position or by name
+        return f'{type(sheet).__name__}:{sheet}'
+
+    def __contains__(self, sheet):
+        return self.key(sheet) in self.manifest['sheets']
+
+    def save_manifest(self):
+        self.folder.mkdir(parents=True, exist_ok=True)
+        data = json.dumps(self.manifest, indent=1).encode('utf-8')
+        _write_atomic(self.manifest_path, lambda f: f.write(data))
+
+    def load(self, sheet):
+        import pandas as pd
+
+        path = self.folder / self.manifest['sheets'][self.key(sheet)]
+        if path.suffix == '.parquet':
+            return pd.read_parquet(path)
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+    def store(self, sheet, frame):
+        self.folder.mkdir(parents=True, exist_ok=True)
+        stem = sha256(self.key(sheet).encode('utf-8')).hexdigest()[:16]
+
+        path = self.folder / f'{stem}.parquet'
+        if not self._store_parquet(path, frame):
+            path = self.folder / f'{stem}.pkl'
+            _write_atomic(path, lambda f: pickle.dump(frame, f, protocol=4))
+
+        self.manifest['sheets'][self.key(sheet)] = path.name
+
+    def _store_parquet(self, path, frame):
+        import pandas as pd
+
+        try:
+            _write_atomic(path, lambda f: frame.to_parquet(f))
+            restored = pd.read_parquet(path)
+        except (ImportError, ValueError, TypeError, NotImplementedError):
+            # No pyarrow, or headers Parquet can't hold
+            return False
+
+        # Index, headers and dtypes all have to come back the same
+        if (restored.equals(frame) and restored.index.equals(frame.index)
+                and restored.columns.equals(frame.columns)
+                and restored.dtypes.equals(frame.dtypes)):
+            return True
+        path.unlink()
+        return False
+
+
+def sheet_names(path, **options):
+    import pandas as pd
+
+    cache = SheetCache(path, options)
+    if cache.manifest['names'] is None:
+        cache.manifest['names'] = pd.ExcelFile(path).sheet_names
+        cache.save_manifest()
+    return cache.manifest['names']
+
+
+def read_workbook(path, sheet_name=0, **options):
+    # pd.read_excel(path, sheet_name, **options), with each sheet only parsed
+    # the first time. A list of sheets or None (every sheet) gives a dict of
+    # frames, just like read_excel.
+    import pandas as pd
+
+    cache = SheetCache(path, options)
+
+    if sheet_name is None:
+        if cache.manifest['names'] is None or not all(
+                name in cache for name in cache.manifest['names']):
+            frames = pd.read_excel(path, sheet_name=None, **options)
+            for name, frame in frames.items():
+                cache.store(name, frame)
+            cache.manifest['names'] = list(frames)
+            cache.save_manifest()
+            return frames
+        return {name: cache.load(name) for name in cache.manifest['names']}
+
+    sheets = sheet_name if isinstance(sheet_name, list) else [sheet_name]
+    missing = [sheet for sheet in sheets if sheet not in cache]
+    if missing:
+        # Anything not converted yet comes from one pass over the workbook
+        frames = pd.read_excel(path, sheet_name=missing, **options)
+        for sheet, frame in frames.items():
+            cache.store(sheet, frame)
+        cache.save_manifest()
+
+    frames = {sheet: cache.load(sheet) for sheet in sheets}
+    return frames if isinstance(sheet_name, list) else frames[sheet_name]
@@ -0,0 +1,105 @@
+from concurrent.futures import ProcessPoolExecutor
+from hashlib import sha1
+import os
+from pathlib import Path
+
+
+# Recolouring a full-size badge and shrinking it takes far longer than
+# drawing it, and the result only depends on the badge, the two colours and
+# the size. So keep each one as a ready-to-place RGBA array, named after a
+# hash of those plus the source file's size and mtime (so a replaced badge is
+# picked up).
+CACHE_FOLDER = '.recoloured'
+
+
+def recolour_badge(team_name, black, white, base_folder=Path('Badges')):
+    img_path = base_folder / f'{team_name}.png'
+    if img_path.is_file():
+        from PIL import Image
+        from PIL.ImageOps import colorize, grayscale
+
+        img = Image.open(img_path).convert('RGBA')
+        r, g, b, a = img.split()
+
+        grey = grayscale(img)
+
+        res = colorize(grey, black, white)
+        res.putalpha(a)
+
+        return res
+
+
+def build_badge(team_name, black, white, size, base_folder, output_path):
+    import numpy as np
+    from PIL import Image
+
+    logo = recolour_badge(team_name, black, white, base_folder)
+    logo = logo.resize((size, size), Image.LANCZOS)
+
+    # Save alongside and rename, so a half-written array is never loaded
+    tmp_path = output_path.with_suffix('.tmp.npy')
+    np.save(tmp_path, np.asarray(logo))
+    os.replace(tmp_path, output_path)
+    return output_path
+
+
+def _build(args):
+    return build_badge(*args)
+
+
+class BadgeCache:
+    def __init__(self, base_folder=Path('Badges'), cache_folder=None, jobs=None):
+        self.base_folder = Path(base_folder)
+        self.cache_folder = Path(cache_folder or self.base_folder / CACHE_FOLDER)
+        self.jobs = jobs
+
+    def path(self, team_name, black, white, size):
+        # None if there's no badge for this team
+        try:
+            stat = (self.base_folder / f'{team_name}.png').stat()
+        except FileNotFoundError:
+            return None
+
+        key = f'{team_name}|{black}|{white}|{size}|{stat.st_size}|{stat.st_mtime_ns}'
+        return self.cache_folder / f'{sha1(key.encode("utf-8")).hexdigest()}.npy'
+
+    def build(self, keys):
+        # Make whatever's missing from (team, black, white, size) keys, spread
+        # over worker processes
+        missing = dict()
+        for team_name, black, white, size in keys:
+            path = self.path(team_name, black, white, size)
+            if path is not None and not path.is_file():
+                missing[path] = (
+                    team_name, black, white, size, self.base_folder, path
+                )
+
+        if not missing:
+            return 0
+
+        self.cache_folder.mkdir(parents=True, exist_ok=True)
+        jobs = min(self.jobs or os.cpu_count() or 1, len(missing))
+        if jobs <= 1:
+            for args in missing.values():
+                _build(args)
+        else:
+            with ProcessPoolExecutor(jobs) as pool:
+                list(pool.map(_build, missing.values()))
+
+        return len(missing)
+
+    def get_many(self, keys):
+        # Arrays in the same order as keys, with None for teams without badges
+        import numpy as np
+
+        keys = list(keys)
+        self.build(keys)
+
+        arrays = []
+        for key in keys:
+            path = self.path(*key)
+            arrays.append(None if path is None else np.load(path))
+        return arrays
+
+    def get(self, team_name, black, white, size):
+        return self.get_many([(team_name, black, white, size)])[0]
@@ -1,68 +1,175 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
-import matplotlib.pyplot as plt
-import pandas as pd
-from pywaffle import Waffle
-import matplotlib.font_manager as font_manager
-
-
-# Update font list
-# font_manager._rebuild()
-
-# plt.rcParams['font.family'] = 'sans-serif'
-# plt.rcParams['font.sans-serif'] = 'Mexcellent'
-plt.rcParams['savefig.facecolor'] = 'k'
-plt.rcParams['text.color'] = 'w'
-
-df = pd.read_csv('goalscorers.csv')
-
-mex_3d = font_manager.FontProperties(
-    fname='mexcellent_3D.otf', size=34
-)
-mex_reg = font_manager.FontProperties(
-    fname='mexcellent_rg.otf', size=12
-)
-
-scorers_dict = dict()
-num_players = 8
-
-for i, scorer in df.head(num_players).iterrows():
-    # scorers_dict[(num_players, 1, i+1)] = dict(
-    scorers_dict[num_players*100 + 10 + i+1] = dict(
-        {
-            'values': [scorer['Goals']],
-            'title': {
-                'label': f'{scorer["Name"]} - {scorer["Goals"]} Goals ({scorer["Career"]})',
-                'loc': 'left',
-                'fontproperties': mex_reg
+from argparse import ArgumentParser
+import os
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from common import rsssf  # noqa: E402
+from common.fetch import fetch  # noqa: E402
+
+
+SCORERS_URL = r'http://www.rsssf.com/tablese/engtops-allt.html'
+COLUMNS = ('Name', 'Goals', 'Career', 'Clubs')
+
+# goalscorers.csv was copied from RSSSF by hand, with the names and clubs
+# tidied up ('WBA', 'Spurs'), so a scrape never replaces it. --update writes
+# the scrape to a file of its own and draws from that instead.
+CURATED_PATH = 'goalscorers.csv'
+CURATED_DATE = '2019-10-29'
+SCRAPED_PATH = 'goalscorers-rsssf.csv'
+
+
+def source_note(date):
+    return f'Source: {SCORERS_URL}, as of {date}'
+
+
+def set_style():
+    import matplotlib.pyplot as plt
+
+    # Update font list
+    # font_manager._rebuild()
+
+    # plt.rcParams['font.family'] = 'sans-serif'
+    # plt.rcParams['font.sans-serif'] = 'Mexcellent'
+    plt.rcParams['savefig.facecolor'] = 'k'
+    plt.rcParams['text.color'] = 'w'
+
+
+def load_scorers(path=CURATED_PATH):
+    import pandas as pd
+
+    return pd.read_csv(path)
+
+
+def scrape_scorers(page=None):
+    import pandas as pd
+
+    # The same columns as goalscorers.csv, straight from RSSSF
+    records = rsssf.scorers(rsssf.pre_text(page or fetch(SCORERS_URL)))
+    return pd.DataFrame.from_records(
+        [(s.name, s.goals, s.career, s.clubs) for s in records],
+        columns=COLUMNS
+    )
+
+
+def check_scorers(df, expected_rows):
+    # A page whose layout has changed parses to nothing, or to a few stray
+    # lines, rather than failing, so look before saving anything
+    if list(df.columns) != list(COLUMNS):
+        raise ValueError(f'Scraped scorers have columns {list(df.columns)}')
+    if len(df) < expected_rows:
+        raise ValueError(
+            f'Only {len(df)} scorers scraped from {SCORERS_URL}, '
+            f'expected at least {expected_rows}'
+        )
+    if df['Name'].str.strip().eq('').any() or not (df['Goals'] > 0).all():
+        raise ValueError(
+            f'Scorers scraped from {SCORERS_URL} have blank names or goals'
+        )
+    if not df['Goals'].is_monotonic_decreasing:
+        raise ValueError(f'Scorers scraped from {SCORERS_URL} are out of order')
+
+
+def save_scorers(df, path=SCRAPED_PATH):
+    # Same encoding as the original file, byte-order mark and all
+    tmp_path = f'{path}.tmp'
+    df.to_csv(tmp_path, index=False, encoding='utf-8-sig')
+    os.replace(tmp_path, path)
+
+
+def scorer_plots(df, num_players=8, title_font=None):
+    scorers_dict = dict()
+
+    for i, scorer in df.head(num_players).iterrows():
+        # scorers_dict[(num_players, 1, i+1)] = dict(
+        scorers_dict[num_players*100 + 10 + i+1] = dict(
+            {
+                'values': [scorer['Goals']],
+                'title': {
+                    'label': f'{scorer["Name"]} - {scorer["Goals"]} Goals ({scorer["Career"]})',
+                    'loc': 'left',
+                    'fontproperties': title_font
+                }
             }
-        }
+        )
+
+    return scorers_dict
+
+
+def draw_scorers(df, output_path='england-scorers.png', num_players=8,
+                 font_folder='.', source=source_note(CURATED_DATE)):
+    import matplotlib.font_manager as font_manager
+    import matplotlib.pyplot as plt
+    from pywaffle import Waffle
+    set_style()
+
+    mex_3d = font_manager.FontProperties(
+        fname=f'{font_folder}/mexcellent_3D.otf', size=34
+    ) if font_folder else font_manager.FontProperties(size=34)
+    mex_reg = font_manager.FontProperties(
+        fname=f'{font_folder}/mexcellent_rg.otf', size=12
+    ) if font_folder else font_manager.FontProperties(size=12)
+
+    fig = plt.figure(
+        FigureClass=Waffle,
+        plots=scorer_plots(df, num_players, mex_reg),
+        rows=5,
+        colors='w',
+        figsize=(11.2, 7.5),
+        icons='futbol',
+        icon_size=6,
+        facecolor='k',
     )
 
-fig = plt.figure(
-    FigureClass=Waffle,
-    plots=scorers_dict,
-    rows=5,
-    colors='w',
-    figsize=(11.2, 7.5),
-    icons='futbol',
-    icon_size=6,
-    facecolor='k',
-)
-
-plt.suptitle(
-    'All-Time Top Scorers in\nEnglish League Football',
-    ha='center', fontproperties=mex_3d,
-    x=(fig.subplotpars.left+fig.subplotpars.right)/2, y=1.15
-)
-
-SOURCE = 'Source: http://www.rsssf.com/tablese/engtops-allt.html, as of 2019-10-29'
-plt.text(
-    fig.subplotpars.left*.55, 0, SOURCE,
-    fontsize='x-small', style='italic', ha='left', va='baseline',
-    alpha=.8,
-    transform=plt.gcf().transFigure
-)
-
-plt.subplots_adjust(bottom=0.02)
-plt.savefig('england-scorers.png', bbox_inches='tight', dpi=150)
+    plt.suptitle(
+        'All-Time Top Scorers in\nEnglish League Football',
+        ha='center', fontproperties=mex_3d,
+        x=(fig.subplotpars.left+fig.subplotpars.right)/2, y=1.15
+    )
+
+    plt.text(
+        fig.subplotpars.left*.55, 0, source,
+        fontsize='x-small', style='italic', ha='left', va='baseline',
+        alpha=.8,
+        transform=plt.gcf().transFigure
+    )
+
+    plt.subplots_adjust(bottom=0.02)
+    plt.savefig(output_path, bbox_inches='tight', dpi=150)
+    plt.close(fig)
+
+
+def main(draw=True, update=False):
+    if update:
+        # A fresh copy of the table should have at least the players in the
+        # hand-made one
+        from datetime import date
+
+        df = scrape_scorers()
+        check_scorers(df, expected_rows=len(load_scorers()))
+        save_scorers(df)
+        source = source_note(date.today().isoformat())
+    else:
+        df = load_scorers()
+        source = source_note(CURATED_DATE)
+
+    if not draw:
+        print(df.head(8))
+        return
+
+    draw_scorers(df, source=source)
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(
+        description='Draw the all-time top scorers in English league football'
+    )
+    parser.add_argument(
+        '--update', action='store_true',
+        help=f'Scrape the table from rsssf.com into {SCRAPED_PATH} and draw '
+             f'from that instead of {CURATED_PATH}'
+    )
+    args = parser.parse_args()
+    main(update=args.update)
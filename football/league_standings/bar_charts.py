@@ -0,0 +1,130 @@
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from time import perf_counter
+
+
+# A labelled horizontal bar chart: one bar per label, longest at the top, with
+# the label at the start of the bar and its value at the end. Everything that
+# changes between charts is here; everything they share is in BarStyle.
+BarChart = namedtuple(
+    'BarChart', 'path labels values title subtitle note title_y',
+    defaults=('', 1.08)
+)
+
+BarStyle = namedtuple(
+    'BarStyle',
+    'foreground background font figsize label_size title_size subtitle_size '
+    'note_size dpi',
+    defaults=((12, 10), 25, 80, 25, 14, 200)
+)
+
+# The style this process has been set up for, so it's only done once
+_ready = None
+
+
+def setup(style):
+    # Fonts go in rcParams once per process. Worker processes run this as
+    # their initializer, so they're ready before their first chart.
+    global _ready
+    if _ready == style:
+        return
+
+    import matplotlib
+
+    matplotlib.rcParams['font.family'] = 'sans-serif'
+    matplotlib.rcParams['font.sans-serif'] = style.font
+    matplotlib.rcParams['font.weight'] = 'regular'
+    _ready = style
+
+
+def draw_bar_chart(template, chart, style):
+    fig, ax = template.figure, template.ax
+
+    rects = ax.barh(y=chart.labels, width=chart.values, fc=style.foreground)
+
+    for label, value, rect in zip(chart.labels, chart.values, rects):
+        y = rect.get_y() + rect.get_height()/2
+        ax.text(
+            x=rect.get_x(), y=y, s='  ' + label,
+            ha='left', va='center',
+            size=style.label_size, weight='regular', c=style.background
+        )
+        ax.text(
+            x=rect.get_width(), y=y, s=f'{value}  ',
+            ha='right', va='center',
+            size=style.label_size, weight='regular', c=style.background
+        )
+
+    ax.margins(x=0, y=0)
+
+    ax.invert_yaxis()
+    ax.set_axis_off()
+
+    fig.suptitle(
+        chart.title, weight='bold', size=style.title_size,
+        c=style.foreground, y=chart.title_y
+    )
+    ax.set_title(
+        chart.subtitle, c=style.foreground, weight='regular',
+        size=style.subtitle_size, y=1.02, loc='left'
+    )
+
+    if chart.note:
+        ax.annotate(
+            text=chart.note, xy=(0, -0.08), xycoords='axes fraction',
+            c=style.foreground, weight='regular', size=style.note_size
+        )
+
+    return dict(
+        bbox_inches='tight', facecolor=style.background, pad_inches=.2,
+        dpi=style.dpi
+    )
+
+
+def render_batch(charts, style, report=False):
+    # Draw charts one after another, each on a new figure
+    from common.render import get_template, render_many
+    setup(style)
+
+    template = partial(
+        get_template, 'labelled_barh', figsize=style.figsize,
+        facecolor=style.background
+    )
+    return render_many(
+        [(chart.path, chart) for chart in charts],
+        partial(draw_bar_chart, style=style), template, report=report
+    )
+
+
+def render_charts(charts, style, jobs=1, report=True):
+    # Render a batch of charts, here or spread over jobs worker processes,
+    # and return the seconds each one took, in the order they were given
+    charts = list(charts)
+    start = perf_counter()
+
+    jobs = max(min(jobs, len(charts)), 1)
+    if jobs == 1:
+        timings = render_batch(charts, style, report)
+    else:
+        # Each worker sets up its style once and then draws every chart in
+        # its share
+        batches = [charts[i::jobs] for i in range(jobs)]
+        with ProcessPoolExecutor(
+                jobs, initializer=setup, initargs=(style,)) as pool:
+            results = pool.map(
+                render_batch, batches, [style] * jobs, [report] * jobs
+            )
+            seconds = {
+                path: elapsed for batch in results for path, elapsed in batch
+            }
+        timings = [(chart.path, seconds[chart.path]) for chart in charts]
+
+    if report:
+        wall = perf_counter() - start
+        busy = sum(elapsed for _, elapsed in timings)
+        print(
+            f'{len(charts)} charts in {wall:.2f}s ({busy:.2f}s drawing) '
+            f'with {jobs} process{"es" if jobs > 1 else ""}'
+        )
+    return timings
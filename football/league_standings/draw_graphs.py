@@ -1,129 +1,130 @@
+from argparse import ArgumentParser
 from pathlib import Path
+import sys
 
-import matplotlib.pyplot as plt
-import pandas as pd
+# bar_charts draws on the templates in common.render
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from bar_charts import BarChart, BarStyle, render_charts  # noqa: E402
+from tier_matrix import TierMatrix  # noqa: E402
 
 
 cur_dir = Path(__file__).parent
 data_dir = cur_dir / 'Data'
 graph_dir = cur_dir / 'Graphs'
-graph_dir.mkdir(exist_ok=True)
-
-# Set up font
-plt.rcParams['font.family'] = 'sans-serif'
-plt.rcParams['font.sans-serif'] = 'Noway Round'
-plt.rcParams['font.weight'] = 'regular'
-
-df = pd.read_csv(data_dir / 'Tier Seasons.csv')
-
-# Get the outsiders
-outsiders = df[df['Highest Level'].ne(1)]
 
 # Set up colours
 light_blue = '#89D2DC'
 dark_blue = '#101d42'
 
-# First, plot the outsiders
-fig, ax = plt.subplots(figsize=(12, 10), facecolor=dark_blue)
+STYLE = BarStyle(
+    foreground=light_blue, background=dark_blue, font='Noway Round'
+)
 
-top_ten = outsiders.groupby('Team')\
-                   .agg({'Total Seasons': 'first'})\
-                   .nlargest(11, 'Total Seasons')
+NOTE = (
+    'Accurate up to 2019-2020 season using data from rsssf.com\n'
+    'For more information, visit '
+    'ruszkow.ski/graphs/2020-06-28-football-league-seasons'
+)
 
-teams = top_ten.index
-seasons = top_ten['Total Seasons']
+# Names too long to fit in the bar
+SHORT_NAMES = {'Gainsborough Trinity': 'Gainsborough'}
 
-rects = ax.barh(y=teams, width=seasons, fc=light_blue)
+TIER_NAMES = {'I': 'top', 'II': 'second', 'III': 'third', 'IV': 'fourth'}
 
-for name, rect in zip(teams, rects):
-    ax.text(
-        x=rect.get_x(), y=rect.get_y()+rect.get_height()/2,
-        s='  ' + name,
-        ha='left', va='center',
-        size=25, weight='regular', c=dark_blue
-    )
 
-    ax.text(
-        x=rect.get_width(), y=rect.get_y()+rect.get_height()/2,
-        s=f'{rect.get_width()}  ',
-        ha='right', va='center',
-        size=25, weight='regular', c=dark_blue
-    )
+def load_seasons(path=data_dir / 'Tier Seasons.csv'):
+    import pandas as pd
 
-ax.margins(x=0, y=0)
+    return TierMatrix.from_frame(pd.read_csv(path))
 
-ax.invert_yaxis()
-ax.set_axis_off()
 
-plt.suptitle('Outsiders', weight='bold', size=80, c=light_blue, y=1.08)
-ax.set_title(
-    'Teams with the most seasons in the English (men\'s) Football\nLeague who have never played in the top flight.',
-    c=light_blue, weight='regular', size=25, y=1.02, loc='left'
-)
+def get_outsiders(seasons):
+    # Teams that have never played in the top flight
+    return seasons.never_played_in('I')
 
-ax.annotate(
-    s='Accurate up to 2019-2020 season using data from rsssf.com\n'
-      'For more information, visit ruszkow.ski/graphs/2020-06-28-football-league-seasons', 
-    xy=(0, -0.08), xycoords='axes fraction',
-    c=light_blue, weight='regular', size=14
-)
 
-plt.savefig(
-    graph_dir / 'outsiders.png', bbox_inches='tight', facecolor='#101d42', 
-    pad_inches=.2, dpi=200
-)
-plt.close()
+def top_outsiders(seasons, outsiders, k=11):
+    return seasons.top(seasons.totals, k, where=outsiders)
 
 
-# Now get the top number of seasons in the second tier
-nearly = outsiders[outsiders['Numeric Level'].eq(2)]\
-                  .sort_values(by='Seasons', ascending=False)\
-                  .nlargest(11, 'Seasons')
+def top_nearly_men(seasons, outsiders, k=11):
+    # Now get the top number of seasons in the second tier
+    return seasons.most_seasons_in('II', k, where=outsiders)
 
-fig, ax = plt.subplots(figsize=(12, 10), facecolor=dark_blue)
 
-# "Gainsborough Trinity" is too long to fit in the bar. Shorten.
-teams = nearly['Team'].str.replace('Gainsborough Trinity', 'Gainsborough')
-seasons = nearly['Seasons']
+def print_top(title, top):
+    print(title)
+    for team, value in zip(*top):
+        print(f'  {team:<30}{value:>5}')
 
-rects = ax.barh(y=teams, width=seasons, fc=light_blue)
 
-for name, rect in zip(teams, rects):
-    ax.text(
-        x=rect.get_x(), y=rect.get_y()+rect.get_height()/2,
-        s='  ' + name,
-        ha='left', va='center',
-        size=25, weight='regular', c=dark_blue
+def bar_chart(top, path, title, subtitle, title_y=1.08):
+    labels = [SHORT_NAMES.get(team, team) for team in top.teams]
+    return BarChart(
+        path, labels, top.values.tolist(), title, subtitle, NOTE, title_y
     )
 
-    ax.text(
-        x=rect.get_width(), y=rect.get_y()+rect.get_height()/2,
-        s=f'{rect.get_width()}  ',
-        ha='right', va='center',
-        size=25, weight='regular', c=dark_blue
+
+def outsiders_chart(top_ten, folder=graph_dir):
+    return bar_chart(
+        top_ten, folder / 'outsiders.png', 'Outsiders',
+        'Teams with the most seasons in the English (men\'s) Football\n'
+        'League who have never played in the top flight.'
     )
 
-ax.margins(x=0, y=0)
 
-ax.invert_yaxis()
-ax.set_axis_off()
+def nearly_men_chart(nearly, folder=graph_dir):
+    return bar_chart(
+        nearly, folder / 'nearly.png', 'Nearly Men',
+        'Teams with the most seasons in the second tier of English\n'
+        '(men\'s) football who have never played in the top flight.',
+        title_y=1.09
+    )
 
-ax.set_facecolor('#101D42')
 
-plt.suptitle('Nearly Men', weight='bold', size=80, c=light_blue, y=1.09)
-ax.set_title(
-    'Teams with the most seasons in the second tier of English\n(men\'s) football who have never played in the top flight.',
-    c=light_blue, weight='regular', size=25, y=1.02, loc='left'
-)
+def tier_charts(seasons, folder=graph_dir, k=11):
+    # The same question for every tier, one chart each
+    return [
+        bar_chart(
+            seasons.most_seasons_in(tier, k), folder / f'tier-{tier}.png',
+            f'Tier {tier}',
+            f'Teams with the most seasons in the {TIER_NAMES[tier]} tier\n'
+            'of English (men\'s) football.'
+        )
+        for tier in seasons.tiers
+    ]
 
-ax.annotate(
-    s='Accurate up to 2019-2020 season using data from rsssf.com\n'
-      'For more information, visit ruszkow.ski/graphs/2020-06-28-football-league-seasons', 
-    xy=(0, -0.08), xycoords='axes fraction',
-    c=light_blue, weight='regular', size=14
-)
 
-plt.savefig(
-    graph_dir / 'nearly.png', bbox_inches='tight', facecolor='#101d42', 
-    pad_inches=.2, dpi=200
-)
+def main(draw=True, tiers=False, jobs=1):
+    seasons = load_seasons()
+    outsiders = get_outsiders(seasons)
+    top_ten = top_outsiders(seasons, outsiders)
+    nearly = top_nearly_men(seasons, outsiders)
+
+    if not draw:
+        print_top('Outsiders', top_ten)
+        print_top('Nearly Men', nearly)
+        return
+
+    graph_dir.mkdir(exist_ok=True)
+
+    charts = [outsiders_chart(top_ten), nearly_men_chart(nearly)]
+    if tiers:
+        charts.extend(tier_charts(seasons))
+    render_charts(charts, STYLE, jobs=jobs)
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(
+        description='Draw the Outsiders and Nearly Men charts'
+    )
+    parser.add_argument(
+        '--tiers', action='store_true',
+        help='Also draw the teams with the most seasons in each tier'
+    )
+    parser.add_argument(
+        '--jobs', type=int, default=1,
+        help='Processes to draw the charts with'
+    )
+    args = parser.parse_args()
+    main(tiers=args.tiers, jobs=args.jobs)
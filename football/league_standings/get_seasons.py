@@ -1,60 +1,101 @@
+from argparse import ArgumentParser
 from pathlib import Path
-import re
-from urllib import request
+import sys
 
-from bs4 import BeautifulSoup
-import pandas as pd
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from common.fetch import fetch  # noqa: E402
+from common.rsssf import league_tiers, pre_text  # noqa: E402
+from common.workbook import read_workbook, sheet_names  # noqa: E402
+
+from season_store import (  # noqa: E402
+    SeasonStore, SeasonTable, record_counts, sheet_counts
+)
 
 
 cur_dir = Path(__file__).parent
 data_dir = cur_dir / 'Data'
-data_dir.mkdir(exist_ok=True)
-
-# Parse RSSSF data
-resp = request.urlopen(r'http://www.rsssf.com/tablese/engall.html')
-soup = BeautifulSoup(resp.read(), features='html.parser')
-content = soup.find_all('pre')[1].text
-
-season_data = []
-
-name_pattern = re.compile(r'^(?P<team>[\w\s\']+)\(')
-season_pattern = re.compile(r'[\d\s]+(?P<tier>I{1,3}|IV)\s+(?P<seasons>\d+)')
-
-for line in content.splitlines():
-    name = name_pattern.search(line)
-    if name:
-        team_name = name.group('team').strip()
-        continue
-    
-    seasons = season_pattern.search(line)
-    if seasons:
-        season_data.append(
-            [team_name, seasons.group('tier'), int(seasons.group('seasons'))]
-        )
-        continue
-    
-    # print(f'Unmatched: "{line}"')
-
-from_site = pd.DataFrame.from_records(
-    season_data, columns=('Team', 'Tier', 'Seasons')
-)
 
-# Read in newer seasons, get counts per level per team
-newer_seasons = pd.concat(
-    pd.read_excel(cur_dir / 'Tiers_1617-1920.xlsx', sheet_name=None).values()
-).groupby(['Team', 'Tier']).size().to_frame(name='Seasons').reset_index()
-
-# Combine
-df = pd.concat([from_site, newer_seasons], ignore_index=True)\
-       .groupby(['Team', 'Tier'], as_index=False).agg({'Seasons': 'sum'})
-
-df['Numeric Level'] = df['Tier'].map({
-    'I': 1,
-    'II': 2,
-    'III': 3,
-    'IV': 4
-})
-
-df['Highest Level'] = df.groupby('Team')['Numeric Level'].transform('min')
-df['Total Seasons'] = df.groupby('Team')['Seasons'].transform('sum')
-df.to_csv(data_dir / 'Tier Seasons.csv', index=False)
+ENGALL_URL = r'http://www.rsssf.com/tablese/engall.html'
+TIERS_WORKBOOK = cur_dir / 'Tiers_1617-1920.xlsx'
+SITE_SOURCE = 'rsssf:engall'
+
+
+def fetch_engall(url=ENGALL_URL):
+    return fetch(url)
+
+
+def parse_engall(html):
+    import pandas as pd
+
+    # The all-time table is in the second <pre> block
+    return pd.DataFrame.from_records(
+        league_tiers(pre_text(html, blocks={1})),
+        columns=('Team', 'Tier', 'Seasons')
+    )
+
+
+def read_newer_seasons(path=TIERS_WORKBOOK):
+    # One sheet per season, one row per team
+    return read_workbook(path, sheet_name=None)
+
+
+def combine_seasons(from_site, newer_sheets):
+    # Everything at once, in memory. The store below does the same a season
+    # at a time.
+    table = SeasonTable()
+    table.add(record_counts(
+        from_site[['Team', 'Tier', 'Seasons']].itertuples(index=False)
+    ))
+    for name, sheet in newer_sheets.items():
+        table.add(sheet_counts(sheet, name))
+    return table.to_frame()
+
+
+def ingest_site(store):
+    # Only scraped the first time
+    if SITE_SOURCE in store:
+        return False
+    records = league_tiers(pre_text(fetch_engall(), blocks={1}))
+    return store.ingest(SITE_SOURCE, record_counts(records))
+
+
+def ingest_seasons(store, path=TIERS_WORKBOOK, sheets=None):
+    # Add any seasons' sheets we haven't seen yet, reading only those
+    ingested = []
+    for name in sheets or sheet_names(path):
+        source = f'season:{name}'
+        if source in store:
+            continue
+        store.ingest(source, sheet_counts(read_workbook(path, name), name))
+        ingested.append(name)
+    return ingested
+
+
+def main(draw=True, workbook=TIERS_WORKBOOK, sheets=None):
+    # Nothing to draw here - draw_graphs.py does that from our output
+    data_dir.mkdir(exist_ok=True)
+
+    store = SeasonStore(data_dir / 'Tier Seasons.csv')
+    changed = ingest_site(store)
+    ingested = ingest_seasons(store, workbook, sheets)
+
+    if changed or ingested or not store.table_path.is_file():
+        store.save()
+    print(f'Added seasons: {", ".join(ingested) or "none"}')
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(
+        description='Add new seasons to Data/Tier Seasons.csv'
+    )
+    parser.add_argument(
+        '--workbook', type=Path, default=TIERS_WORKBOOK,
+        help='Workbook with one sheet per season'
+    )
+    parser.add_argument(
+        '--sheet', action='append', dest='sheets',
+        help='Only ingest this sheet (can be given more than once)'
+    )
+    args = parser.parse_args()
+
+    main(workbook=args.workbook, sheets=args.sheets)
@@ -0,0 +1,133 @@
+from collections import Counter
+import csv
+import json
+import os
+from pathlib import Path
+
+
+LEVELS = {
+    'I': 1,
+    'II': 2,
+    'III': 3,
+    'IV': 4
+}
+
+COLUMNS = (
+    'Team', 'Tier', 'Seasons', 'Numeric Level', 'Highest Level', 'Total Seasons'
+)
+
+
+def sheet_counts(sheet, name=None):
+    # One row per team in a season's sheet, so each row is one season. Rows
+    # with no tier are skipped, and a tier we don't know stops the ingest
+    # rather than being counted.
+    counts = Counter()
+    for row, (team, tier) in enumerate(zip(sheet['Team'], sheet['Tier'])):
+        # (NaN is the only value not equal to itself)
+        if tier != tier or tier is None or str(tier).strip() == '':
+            continue
+        tier = str(tier).strip()
+        if tier not in LEVELS:
+            # Spreadsheet rows count from 1, after the header row
+            raise ValueError(
+                f'Unknown tier {tier!r} for {team} in sheet {name!r}, '
+                f'row {row + 2}'
+            )
+        counts[team, tier] += 1
+    return counts
+
+
+def record_counts(records):
+    # (team, tier, seasons) records, like the RSSSF all-time table
+    counts = Counter()
+    for team, tier, seasons in records:
+        counts[team, tier] += seasons
+    return counts
+
+
+class SeasonTable:
+    # Seasons per team per tier, with each team's highest level and total
+    # seasons kept up to date as counts are added, rather than worked out
+    # again over the whole table
+    def __init__(self):
+        self.seasons = Counter()
+        self.highest = dict()
+        self.totals = Counter()
+
+    def add(self, counts):
+        for (team, tier), seasons in counts.items():
+            self.seasons[team, tier] += seasons
+            self.totals[team] += seasons
+            level = LEVELS[tier]
+            if level < self.highest.get(team, len(LEVELS) + 1):
+                self.highest[team] = level
+
+    def rows(self):
+        for team, tier in sorted(self.seasons):
+            yield (
+                team, tier, self.seasons[team, tier], LEVELS[tier],
+                self.highest[team], self.totals[team]
+            )
+
+    def to_frame(self):
+        import pandas as pd
+
+        return pd.DataFrame.from_records(list(self.rows()), columns=COLUMNS)
+
+    def write_csv(self, path):
+        path = Path(path)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w', newline='') as f:
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow(COLUMNS)
+            writer.writerows(self.rows())
+        os.replace(tmp_path, path)
+
+
+class SeasonStore:
+    # An append-only log of everything ingested (the RSSSF table, then one
+    # entry per season's sheet) next to the table built from it. Ingesting a
+    # season appends its counts to the log and adds them to the table, and a
+    # source that's already in the log is skipped, so it's safe to rerun.
+    def __init__(self, table_path):
+        self.table_path = Path(table_path)
+        self.log_path = self.table_path.with_suffix('.jsonl')
+        self.table = SeasonTable()
+        self.sources = []
+
+        # Replaying the log is only adding up counts, and means the table
+        # can never miss something that made it into the log
+        if self.log_path.is_file():
+            with open(self.log_path, 'r') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._apply(entry['source'], entry['counts'])
+
+    def _apply(self, source, counts):
+        self.sources.append(source)
+        self.table.add(
+            {(team, tier): seasons for team, tier, seasons in counts}
+        )
+
+    def __contains__(self, source):
+        return source in self.sources
+
+    def ingest(self, source, counts):
+        if source in self:
+            return False
+
+        counts = [
+            [team, tier, seasons] for (team, tier), seasons in counts.items()
+        ]
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.log_path, 'a') as f:
+            f.write(json.dumps({'source': source, 'counts': counts}) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._apply(source, counts)
+        return True
+
+    def save(self):
+        self.table.write_csv(self.table_path)
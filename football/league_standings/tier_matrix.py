@@ -0,0 +1,132 @@
+from collections import namedtuple
+
+from season_store import LEVELS
+
+
+# The answer to a ranking query: team names and their values, best first
+Top = namedtuple('Top', 'teams values')
+
+
+class TierMatrix:
+    # Seasons per team per tier as one teams x tiers array of ints, with
+    # the teams sorted by name and an index from name to row. Everything
+    # else (totals, highest level, filters) is worked out from the array
+    # once, so a query is a mask and a partial sort over a few thousand
+    # numbers rather than a groupby.
+    def __init__(self, teams, seasons):
+        import numpy as np
+
+        self.teams = np.asarray(teams, dtype=object)
+        self.seasons = np.asarray(seasons, dtype=np.int64)
+        self.index = {team: row for row, team in enumerate(self.teams)}
+        self.tiers = tuple(LEVELS)
+
+        self.played = self.seasons > 0
+        self.totals = self.seasons.sum(axis=1)
+        # Tiers run from the top down, so the first one played is the highest
+        self.highest = self.played.argmax(axis=1) + 1
+
+    @classmethod
+    def from_columns(cls, teams, tiers, seasons):
+        import numpy as np
+
+        names, rows = np.unique(
+            np.asarray(teams, dtype=str), return_inverse=True
+        )
+        columns = np.array([LEVELS[tier] - 1 for tier in tiers], dtype=np.intp)
+
+        matrix = np.zeros((len(names), len(LEVELS)), dtype=np.int64)
+        np.add.at(matrix, (rows, columns), np.asarray(seasons, dtype=np.int64))
+        return cls(names.astype(object), matrix)
+
+    @classmethod
+    def from_frame(cls, df):
+        # A Tier Seasons table, one row per team per tier
+        return cls.from_columns(df['Team'], df['Tier'], df['Seasons'])
+
+    def __len__(self):
+        return len(self.teams)
+
+    def __contains__(self, team):
+        return team in self.index
+
+    def team(self, name):
+        return dict(zip(self.tiers, self.seasons[self.index[name]].tolist()))
+
+    def tier(self, tier):
+        # Seasons in one tier, by name ('II') or number (2)
+        return self.seasons[:, self._column(tier)]
+
+    # Filters, as boolean masks over the teams. Combine them with & and |.
+    def played_in(self, tier):
+        return self.played[:, self._column(tier)]
+
+    def never_played_in(self, tier):
+        return ~self.played_in(tier)
+
+    def highest_at(self, tier):
+        return self.highest == self._column(tier) + 1
+
+    def every_tier(self):
+        return self.played.all(axis=1)
+
+    def _column(self, tier):
+        return (LEVELS[tier] if isinstance(tier, str) else tier) - 1
+
+    # Queries
+    def _rows(self, values, where):
+        import numpy as np
+
+        values = np.asarray(values)
+        rows = np.arange(len(self)) if where is None else np.flatnonzero(where)
+        return values, rows
+
+    def _sorted(self, values, rows):
+        import numpy as np
+
+        # Highest first, ties in name order
+        return rows[np.lexsort((rows, -values[rows]))]
+
+    def top(self, values, k=10, where=None):
+        # The k teams with the largest values, out of those in where
+        import numpy as np
+
+        values, rows = self._rows(values, where)
+        k = max(min(k, len(rows)), 0)
+        if k == 0:
+            return Top(self.teams[:0], values[:0])
+        if k < len(rows):
+            # Only the k largest need sorting, along with anything tied
+            # with the smallest of them
+            cutoff = np.partition(values[rows], len(rows) - k)[len(rows) - k]
+            rows = rows[values[rows] >= cutoff]
+
+        order = self._sorted(values, rows)[:k]
+        return Top(self.teams[order], values[order])
+
+    def rank(self, values, where=None):
+        # Every team in where, best first, with sporting ranks: teams on the
+        # same value share a rank and the next rank skips past them
+        import numpy as np
+
+        values, rows = self._rows(values, where)
+        order = self._sorted(values, rows)
+        ranked = values[order]
+
+        positions = np.arange(1, len(order) + 1)
+        changed = np.r_[True, ranked[1:] != ranked[:-1]]
+        ranks = np.maximum.accumulate(np.where(changed, positions, 0))
+        return Top(self.teams[order], ranked), ranks
+
+    def rank_of(self, team, values, where=None):
+        top, ranks = self.rank(values, where)
+        found = (top.teams == team).nonzero()[0]
+        return int(ranks[found[0]]) if len(found) else None
+
+    def most_seasons_in(self, tier, k=10, where=None):
+        # The data has seasons per tier, not when they were, so this is the
+        # longest a team has spent in a tier altogether
+        played = self.played_in(tier)
+        return self.top(
+            self.tier(tier), k, played if where is None else played & where
+        )
@@ -1,57 +1,84 @@
-import calmap
-from matplotlib.colors import ListedColormap
-import matplotlib.patheffects as pe
-import matplotlib.pyplot as plt
-import pandas as pd
-
-
-plt.rcParams['font.family'] = 'sans-serif'
-plt.rcParams['font.sans-serif'] = 'Gilroy'
-
 # Set up colours
 bg_colour = '#11151C'
 # zero_colour = '#212D40'
 zero_colour = '#364156'
 sep_colour = '#7D4E57'
 highlight_colour = '#D66853'
-cm = ListedColormap(['white', highlight_colour])
 
-df = pd.read_csv('2019 gigs.csv', parse_dates=['Start', 'End']).assign(Count=1)
 
-# Convert to midnight for each day
-df['Start Day'] = df['Start'].dt.normalize()
-df['End Day'] = (df['End'] - pd.Timedelta(hours=1)).dt.normalize()
+def set_style():
+    import matplotlib.pyplot as plt
+
+    plt.rcParams['font.family'] = 'sans-serif'
+    plt.rcParams['font.sans-serif'] = 'Gilroy'
+
+
+def load_gigs(path='2019 gigs.csv'):
+    import pandas as pd
+
+    return pd.read_csv(path, parse_dates=['Start', 'End']).assign(Count=1)
+
+
+def gig_days(df):
+    import pandas as pd
+
+    # Convert to midnight for each day
+    df['Start Day'] = df['Start'].dt.normalize()
+    df['End Day'] = (df['End'] - pd.Timedelta(hours=1)).dt.normalize()
+
+    df = pd.concat([
+        pd.DataFrame(
+            {'Day': pd.date_range(row['Start Day'], row['End Day'], freq='1D'),
+             'Event': row['Event'],
+             'Location': row['Location'],
+             'Count': row['Count']}, columns=['Day', 'Event', 'Location', 'Count']
+        ) for i, row in df.iterrows()
+    ], ignore_index=True)
+
+    df.set_index('Day', inplace=True)
+    return df
+
+
+def draw_calendar(df, output_path='2019-Gig-Calendar.png', year=2019):
+    import calmap
+    from matplotlib.colors import ListedColormap
+    import matplotlib.patheffects as pe
+    import matplotlib.pyplot as plt
+    set_style()
+
+    cm = ListedColormap(['white', highlight_colour])
+
+    fig, ax = plt.subplots(figsize=(15, 10))
+
+    calmap.yearplot(
+        df['Count'], year=year, ax=ax, how=None, vmin=0, vmax=1,
+        monthseparator=True, separatorwidth=2,
+        fillcolor=zero_colour, linecolor=bg_colour, cmap=cm, separatorcolor=sep_colour
+    )
+
+    ax.tick_params(axis='both', colors=highlight_colour)
+    ax.tick_params(axis='x', labelsize=20)
+    ax.tick_params(axis='y', labelsize=15)
 
-df = pd.concat([
-    pd.DataFrame(
-        {'Day': pd.date_range(row['Start Day'], row['End Day'], freq='1D'),
-         'Event': row['Event'],
-         'Location': row['Location'],
-         'Count': row['Count']}, columns=['Day', 'Event', 'Location', 'Count']
-    ) for i, row in df.iterrows()
-], ignore_index=True)
+    title = ax.set_title(f'{year} Gig Calendar', fontweight='bold', color=highlight_colour, size=40)
 
-df.set_index('Day', inplace=True)
-print(df)
+    title.set_path_effects([pe.Stroke(linewidth=1.5, foreground=zero_colour),
+                            pe.Normal()])
 
-fig, ax = plt.subplots(figsize=(15, 10))
+    # Set colours
+    ax.set_facecolor(bg_colour)
 
-calmap.yearplot(
-    df['Count'], year=2019, ax=ax, how=None, vmin=0, vmax=1,
-    monthseparator=True, separatorwidth=2,
-    fillcolor=zero_colour, linecolor=bg_colour, cmap=cm, separatorcolor=sep_colour
-)
+    plt.savefig(output_path, bbox_inches='tight', facecolor=bg_colour)
+    plt.close(fig)
 
-ax.tick_params(axis='both', colors=highlight_colour)
-ax.tick_params(axis='x', labelsize=20)
-ax.tick_params(axis='y', labelsize=15)
 
-title = ax.set_title('2019 Gig Calendar', fontweight='bold', color=highlight_colour, size=40)
+def main(draw=True):
+    df = gig_days(load_gigs())
+    print(df)
 
-title.set_path_effects([pe.Stroke(linewidth=1.5, foreground=zero_colour),
-                        pe.Normal()])
+    if draw:
+        draw_calendar(df)
 
-# Set colours
-ax.set_facecolor(bg_colour)
 
-plt.savefig('2019-Gig-Calendar.png', bbox_inches='tight', facecolor=bg_colour)
+if __name__ == '__main__':
+    main()
@@ -1,20 +1,36 @@
 import csv
 
-from ics import Calendar
 
-with open('events.ics', 'r') as f:
-    data = f.read()
+def read_calendar(path='events.ics'):
+    from ics import Calendar
 
-c = Calendar(data)
+    with open(path, 'r') as f:
+        data = f.read()
 
-with open('2019 Events.csv', 'w', newline='') as f:
-    writer = csv.DictWriter(f, fieldnames=['Event', 'Location', 'Start', 'End'])
-    writer.writeheader()
+    return Calendar(data)
 
-    for e in c.timeline:
-        print(f"Event '{e.name}' at {e.location} started {e.begin.humanize()}")
-        if str(e.begin)[:4] == '2019':
-            writer.writerow(
-                {'Event': e.name, 'Start': e.begin, 'End': e.end, 'Location': e.location}
-            )
 
+def events_in_year(calendar, year='2019', verbose=False):
+    for e in calendar.timeline:
+        if verbose:
+            print(f"Event '{e.name}' at {e.location} started {e.begin.humanize()}")
+        if str(e.begin)[:4] == year:
+            yield {'Event': e.name, 'Start': e.begin, 'End': e.end, 'Location': e.location}
+
+
+def write_events(events, path='2019 Events.csv'):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=['Event', 'Location', 'Start', 'End'])
+        writer.writeheader()
+
+        for event in events:
+            writer.writerow(event)
+
+
+def main(draw=True):
+    # Only data here - make_cal.py draws the calendar
+    write_events(events_in_year(read_calendar(), verbose=True))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,31 +1,41 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+from functools import partial
 import os
+from pathlib import Path
+import sys
 
-import matplotlib.pyplot as plt
-import pandas as pd
-import seaborn as sns
-sns.set_context('talk')
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from common.workbook import read_workbook  # noqa: E402
 
 
 DEST_DIR = 'Yearly Totals'
-if not os.path.isdir(DEST_DIR):
-    os.mkdir(DEST_DIR)
 
 SOURCE = (
     'Source (as of 2019-10-07): '
     'playsmartplaysafe.com/newsroom/reports/injury-data/'
 )
 
-frames = pd.read_excel('InjuryData.xlsx', sheet_name=None, header=[0, 1], index_col=0)
-print(frames)
 
-for injury, data in frames.items():
-    totals = data.xs('Preseason + Regular Season', level=0, axis=1)\
-                 .drop('Total', axis=1)
+def set_style():
+    import seaborn as sns
 
-    fig, ax = plt.subplots(figsize=(16, 6))
+    sns.set_context('talk')
+
+
+def read_injuries(path='InjuryData.xlsx'):
+    return read_workbook(path, sheet_name=None, header=[0, 1], index_col=0)
+
+
+def season_totals(data):
+    return data.xs('Preseason + Regular Season', level=0, axis=1)\
+               .drop('Total', axis=1)
+
+
+def draw_injury(template, job):
+    injury, totals = job
+    fig, ax = template.figure, template.ax
 
     totals.plot.bar(
         stacked=True, color=['#013369', '#D50A0A'], ax=ax, zorder=2, width=.75,
@@ -38,35 +48,64 @@ for injury, data in frames.items():
 
     ax.tick_params(which='both', length=0)
     ax.tick_params(axis='y', which='major', pad=3, colors='gainsboro')
-    ax.tick_params(axis='x', which='major', pad=10)
-    plt.xticks(rotation=0)
-    plt.legend(bbox_to_anchor=(0.5, -0.1), loc='upper center', ncol=2)
+    ax.tick_params(axis='x', which='major', pad=10, labelrotation=0)
+    ax.legend(bbox_to_anchor=(0.5, -0.1), loc='upper center', ncol=2)
 
     for p in ax.patches:
         size = int(p.get_height())
-        text = ax.annotate(
-            s=f'{size}',
+        ax.annotate(
+            text=f'{size}',
             xy=(p.get_x() + p.get_width() / 2, p.get_y() + size / 2),
             ha='center', va='center', color='white', weight='bold'
         )
 
     mid = (fig.subplotpars.right + fig.subplotpars.left) / 2
 
-    plt.title(
+    ax.set_title(
         f'{injury} per Year (including preseason)', weight='bold', x=mid,
         fontsize='x-large'
     )
-    # plt.title(SOURCE, fontsize='xx-small')
-    plt.text(
+    # ax.set_title(SOURCE, fontsize='xx-small')
+    ax.text(
         fig.subplotpars.left, 0, SOURCE,
         fontsize='xx-small', style='italic', ha='left', va='baseline',
         alpha=.5,
-        transform=plt.gcf().transFigure
+        transform=fig.transFigure
     )
 
-    plt.subplots_adjust(bottom=0.2)
-    plt.savefig(
-        os.path.join(DEST_DIR, f'{injury.lower().replace(" ", "-")}.png'),
-        bbox_inches='tight'
+    fig.subplots_adjust(bottom=0.2)
+    return dict(bbox_inches='tight')
+
+
+def draw_all(totals, dest_dir=DEST_DIR, report=True):
+    from common.render import get_template, render_many
+    set_style()
+
+    template = partial(get_template, 'injury_totals', figsize=(16, 6))
+    return render_many(
+        [
+            (os.path.join(dest_dir, f'{injury.lower().replace(" ", "-")}.png'),
+             (injury, data))
+            for injury, data in totals.items()
+        ],
+        draw_injury, template, report=report
     )
-    plt.close('all')
+
+
+def main(draw=True):
+    frames = read_injuries()
+    print(frames)
+
+    if not draw:
+        return
+
+    if not os.path.isdir(DEST_DIR):
+        os.mkdir(DEST_DIR)
+
+    draw_all({
+        injury: season_totals(data) for injury, data in frames.items()
+    })
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from argparse import ArgumentParser
+from datetime import datetime, timedelta
+import os
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+import numpy as np
+
+from midas import MidasData
+
+
+# Roughly the column layout of the MIDAS Open hourly weather files
+COLUMNS = [
+    'ob_time', 'id', 'id_type', 'met_domain_name', 'version_num', 'src_id',
+    'rec_st_ind', 'wind_speed_unit_id', 'src_opr_type', 'wind_direction',
+    'wind_speed', 'prst_wx_id', 'past_wx_id_1', 'past_wx_id_2',
+    'cld_ttl_amt_id', 'low_cld_type_id', 'med_cld_type_id', 'hi_cld_type_id',
+    'cld_base_amt_id', 'cld_base_ht', 'visibility', 'msl_pressure',
+    'cld_amt_id_1', 'cloud_type_id_1', 'cld_base_ht_id_1', 'cld_amt_id_2',
+    'cloud_type_id_2', 'cld_base_ht_id_2', 'cld_amt_id_3', 'cloud_type_id_3',
+    'cld_base_ht_id_3', 'cld_amt_id_4', 'cloud_type_id_4', 'cld_base_ht_id_4',
+    'vert_vsby', 'air_temperature', 'dewpoint', 'wetb_temp', 'stn_pres',
+    'alt_pres', 'ground_state_id', 'q10mnt_mxgst_spd', 'cavok_flag',
+    'cs_hr_sun_dur', 'wmo_hr_sun_dur', 'wind_direction_q', 'wind_speed_q',
+    'air_temperature_q', 'dewpoint_q', 'msl_pressure_q', 'meto_stmp_time',
+    'midas_stmp_etime', 'rltv_hum', 'snow_depth',
+]
+HEADER_ROWS = 280
+
+
+def write_synthetic(path, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    start = datetime(2017, 1, 1)
+    step = timedelta(hours=1)
+
+    # Everything other than the time and temperature is filler
+    filler = ['1'] * (len(COLUMNS) - 2)
+    temp_idx = COLUMNS.index('air_temperature')
+    temps = rng.normal(10, 6, rows).round(1)
+
+    with open(path, 'w') as f:
+        f.write('Conventions,G,BADC-CSV,1\n')
+        for i in range(HEADER_ROWS - 2):
+            f.write(f'comments,G,Synthetic metadata line {i}\n')
+        f.write('data\n')
+        f.write(','.join(COLUMNS) + '\n')
+
+        for i in range(rows):
+            values = filler.copy()
+            values.insert(temp_idx - 1, str(temps[i]))
+            f.write(
+                (start + step * i).strftime('%Y-%m-%d %H:%M:%S') + ','
+                + ','.join(values) + '\n'
+            )
+        f.write('end data\n')
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        result = func()
+        timings.append(perf_counter() - start)
+    return min(timings), result
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(
+        description='Compare MIDAS CSV reader modes on a synthetic file'
+    )
+    parser.add_argument('--rows', type=int, default=300_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    modes = {
+        'python (current)': dict(engine='python'),
+        'c, all columns': dict(engine='c'),
+        'c, air_temperature': dict(engine='c', columns=['air_temperature']),
+    }
+    try:
+        import pyarrow  # noqa: F401
+        modes['pyarrow, air_temperature'] = dict(
+            engine='pyarrow', columns=['air_temperature']
+        )
+    except ImportError:
+        pass
+
+    with TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'synthetic.csv')
+        write_synthetic(path, args.rows)
+        size = os.path.getsize(path) / 1024 ** 2
+        print(f'{args.rows:,} rows, {size:.1f} MB\n')
+
+        baseline = None
+        reference = None
+        for name, kwargs in modes.items():
+            seconds, md = best_of(lambda: MidasData(path, **kwargs), args.repeat)
+            baseline = baseline or seconds
+
+            # Make sure the fast modes give us the same answer
+            if reference is None:
+                reference = md.data
+            else:
+                assert (md.data['Hour'].values == reference['Hour'].values).all()
+                assert (md.data['Month'] == reference['Month']).all()
+                assert np.allclose(
+                    md.data['air_temperature'], reference['air_temperature']
+                )
+
+            mem = md.data.memory_usage(deep=True).sum() / 1024 ** 2
+            print(
+                f'{name:<28}{seconds:8.2f}s{baseline / seconds:8.1f}x'
+                f'{mem:10.1f} MB in memory'
+            )
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from argparse import ArgumentParser
+import os
+from tempfile import TemporaryDirectory
+
+import numpy as np
+import pandas as pd
+
+# midas puts the top of the repo on the path for us
+from midas import MidasData, add_time_fields
+from graph_all_air_temps import HOURS, PLOT_PARAMS
+
+
+def synthetic_year(year=2017, seed=0):
+    rng = np.random.default_rng(seed)
+    times = pd.date_range(f'{year}-01-01', f'{year}-12-31 23:00', freq='h')
+    seasonal = 9 - 6 * np.cos(2 * np.pi * times.dayofyear / 365)
+    data = pd.DataFrame({
+        'ob_time': times.strftime('%Y-%m-%d %H:%M:%S'),
+        'air_temperature': (seasonal + rng.normal(0, 3, len(times))).round(1),
+    })
+
+    data = add_time_fields(data)
+    data = data[data['Hour'].between(*HOURS)].copy()
+    data['Mean Temp'] = (
+        data.groupby('Month')['air_temperature'].transform('mean')
+    )
+    return MidasData.from_frame(data)
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(
+        description='Time ridge plots drawn on a fresh figure vs a reused one'
+    )
+    parser.add_argument('--images', type=int, default=10)
+    args = parser.parse_args()
+
+    md = synthetic_year()
+
+    with TemporaryDirectory() as tmp:
+        results = dict()
+        for mode, reuse in (('rebuilt', False), ('reused', True)):
+            results[mode] = [
+                md.monthly_ridge_plot(
+                    title=f'Image {i}', output_path=os.path.join(tmp, f'{i}.png'),
+                    reuse=reuse, **PLOT_PARAMS
+                )
+                for i in range(args.images)
+            ]
+
+        print('image   rebuilt    reused')
+        for i, (rebuilt, reused) in enumerate(zip(*results.values())):
+            print(f'{i:5}{rebuilt:9.2f}s{reused:9.2f}s')
+        print(
+            f' mean{np.mean(results["rebuilt"]):9.2f}s'
+            f'{np.mean(results["reused"]):9.2f}s'
+        )
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Checks the built-in density engine against seaborn's kdeplot for the
+# settings used by graph_all_air_temps.py (bw=.4). Exits non-zero if any month
+# differs by more than the tolerance.
+from argparse import ArgumentParser
+import sys
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import seaborn as sns  # noqa: E402
+
+from density import grouped_density  # noqa: E402
+from midas import MONTHS, MidasData  # noqa: E402
+
+
+def seaborn_curve(values, bw):
+    fig, ax = plt.subplots()
+    version = tuple(int(p) for p in sns.__version__.split('.')[:2])
+    if version < (0, 11):
+        sns.kdeplot(values, bw=bw, ax=ax)
+    else:
+        sns.kdeplot(x=values, bw_method=bw, ax=ax)
+    x, y = ax.lines[0].get_xydata().T
+    plt.close(fig)
+    return x, y
+
+
+def synthetic(seed=0, per_month=360):
+    # Roughly a year of daytime temperatures
+    rng = np.random.default_rng(seed)
+    centres = 4 + 9 * np.sin(np.linspace(-np.pi / 2, 3 * np.pi / 2, 12)) ** 2
+    values = np.concatenate([
+        rng.normal(c, 3, per_month).round(1) for c in centres
+    ])
+    months = np.repeat(np.arange(12), per_month)
+    return values, months
+
+
+def worst_difference(densities, month, values, bw):
+    x, expected = seaborn_curve(values, bw)
+    ours = np.interp(x, densities.grid, densities.density[month])
+    keep = np.isfinite(ours)
+    return np.abs(ours[keep] - expected[keep]).max() / expected.max()
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(
+        description="Compare the built-in monthly densities with seaborn's"
+    )
+    parser.add_argument('--csv', help='Check against a real MIDAS file')
+    parser.add_argument('--bw', type=float, default=.4)
+    parser.add_argument(
+        '--tolerance', type=float, default=.02,
+        help='Largest allowed difference, as a fraction of the peak density'
+    )
+    args = parser.parse_args()
+
+    if args.csv:
+        md = MidasData(args.csv, engine='c', columns=['air_temperature'])
+        data = md.data[md.data['Hour'].between(7, 18)].dropna()
+        values = data['air_temperature'].to_numpy(dtype=float)
+        months = data['Month'].cat.codes.to_numpy()
+    else:
+        values, months = synthetic()
+
+    failed = False
+    for method in ('exact', 'binned'):
+        densities = grouped_density(
+            values, months, len(MONTHS), bw=args.bw, method=method
+        )
+        print(method)
+        for i, month in enumerate(MONTHS):
+            month_values = values[months == i]
+            if len(month_values) < 2:
+                continue
+            diff = worst_difference(densities, i, month_values, args.bw)
+            ok = diff <= args.tolerance
+            failed |= not ok
+            print(f'  {month}  {diff:.4%}  {"ok" if ok else "FAIL"}')
+
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Checks that months with no temperatures (no rows, only blank readings, or a
+# single reading) leave a blank density rather than an error, and that a
+# station-year with every hour present but no readings at all is rejected
+# rather than failing in the worker, which would retry it on every run.
+# Exits non-zero if any check fails.
+from datetime import datetime, timedelta
+import sys
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np  # noqa: E402
+
+from density import grouped_density  # noqa: E402
+from graph_all_air_temps import process_site  # noqa: E402
+from midas import MONTHS  # noqa: E402
+from validation import Rejection  # noqa: E402
+
+
+def blank_file(days=365):
+    # A MIDAS file with a row for every hour and no air temperatures
+    start = datetime(2019, 1, 1)
+    lines = ['Conventions,G,BADC-CSV,1', 'data', 'ob_time,air_temperature']
+    lines += [
+        f'{start + timedelta(hours=hour):%Y-%m-%d %H:%M:%S},'
+        for hour in range(days * 24)
+    ]
+    lines.append('end data')
+    return '\n'.join(lines).encode()
+
+
+def check(name, ok):
+    print(f'{name:<40}{"ok" if ok else "FAIL"}')
+    return ok
+
+
+if __name__ == '__main__':
+    results = []
+
+    cases = {
+        'no values': ([], []),
+        'only NaNs': ([np.nan] * 12, range(12)),
+        'one value per month': (np.arange(12.), range(12)),
+        'one month empty': (
+            [np.nan, *np.linspace(0, 10, 110)], [0, *np.arange(110) % 11 + 1]
+        ),
+    }
+    for name, (values, months) in cases.items():
+        values = np.asarray(values, dtype=float)
+        months = np.asarray(months, dtype=np.intp)
+        for method in ('exact', 'binned'):
+            try:
+                densities = grouped_density(
+                    values, months, len(MONTHS), method=method
+                )
+            except Exception as e:
+                print(f'{name} ({method}): {e!r}')
+                results.append(check(f'{name} ({method})', False))
+                continue
+
+            # Months with fewer than two readings are blank, the rest aren't
+            counts = np.bincount(
+                months[np.isfinite(values)], minlength=len(MONTHS)
+            )
+            blank = np.isnan(densities.density).all(axis=1)
+            results.append(check(
+                f'{name} ({method})',
+                np.isfinite(densities.grid).all()
+                and (blank == (counts < 2)).all()
+            ))
+
+    payload = blank_file()
+    for streaming in (False, True):
+        result = process_site(
+            'folder', 'sub_station', 2019, payload, streaming=streaming
+        )
+        results.append(check(
+            f'no readings ({"streamed" if streaming else "parsed"})',
+            isinstance(result, Rejection) and result.reason == 'no values'
+        ))
+
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from ftplib import all_errors
+import json
+import os
+import posixpath
+from queue import Queue
+from threading import Lock, Thread
+
+from ftp_session import FtpSession
+
+
+class ListingCrawler:
+    # Lists an FTP tree over several connections at once, appending each
+    # directory's listing to a local JSON-lines index as soon as it's done.
+    #
+    # If a crawl is interrupted, the next one picks up where it left off. Once
+    # a crawl has finished, later runs just read the index back (unless asked
+    # to refresh), so they don't need to touch the FTP until they download.
+    def __init__(self, index_path, session_args, connections=4, descend=None):
+        self.index_path = index_path
+        self.session_args = session_args
+        self.connections = connections
+        # descend(parts) decides whether to list a directory, given its path
+        # components below the root
+        self.descend = descend or (lambda parts: True)
+
+        self.listed = dict()
+        self.complete = False
+        self.lock = Lock()
+
+    def _load(self):
+        self.listed = dict()
+        self.complete = False
+        if not os.path.isfile(self.index_path):
+            return
+
+        with open(self.index_path, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A half-written last line from an interrupted run
+                    continue
+                if record.get('complete'):
+                    self.complete = True
+                else:
+                    self.listed[record['path']] = record
+
+    def _append(self, record):
+        with self.lock, open(self.index_path, 'a') as f:
+            f.write(json.dumps(record, separators=(',', ':')) + '\n')
+
+    def _children(self, root, record):
+        for name in record['dirs']:
+            path = posixpath.join(record['path'], name)
+            parts = tuple(posixpath.relpath(path, root).split('/'))
+            if self.descend(parts):
+                yield path
+
+    @staticmethod
+    def _files(record):
+        for name, size, mtime in record['files']:
+            yield record['path'], name, size, mtime
+
+    def crawl(self, root, refresh=False):
+        # Yields (directory, name, size, mtime) for every file, as soon as its
+        # directory has been listed (or straight away, if already indexed)
+        if refresh and os.path.isfile(self.index_path):
+            os.remove(self.index_path)
+        self._load()
+
+        # Walk what we already have, and note the directories still to list
+        frontier = []
+        stack = [root]
+        while stack:
+            path = stack.pop()
+            record = self.listed.get(path)
+            if record is None:
+                frontier.append(path)
+                continue
+            yield from self._files(record)
+            stack.extend(self._children(root, record))
+
+        if not frontier:
+            if not self.complete:
+                self._append({'complete': True})
+            return
+
+        yield from self._crawl_frontier(root, frontier)
+
+    def _crawl_frontier(self, root, frontier):
+        pending = Queue()
+        found = Queue()
+        state = {'outstanding': len(frontier), 'failed': 0}
+        errors = []
+
+        for path in frontier:
+            pending.put(path)
+
+        def finish_one():
+            with self.lock:
+                state['outstanding'] -= 1
+                finished = state['outstanding'] == 0
+            if finished:
+                for _ in range(self.connections):
+                    pending.put(None)
+                found.put(None)
+
+        def fail(error):
+            # Anything other than a failed listing stops the whole crawl, and
+            # crawl() raises it once the workers have stopped
+            with self.lock:
+                errors.append(error)
+            for _ in range(self.connections):
+                pending.put(None)
+            found.put(None)
+
+        def list_one(session, path):
+            try:
+                entries = session.listing(path)
+            except all_errors as e:
+                # Left out of the index, so the next run tries again
+                print('Listing failed:', path, e)
+                with self.lock:
+                    state['failed'] += 1
+                return
+
+            record = {
+                'path': path,
+                'dirs': sorted(n for n, is_dir, _, _ in entries if is_dir),
+                'files': sorted(
+                    [n, s and int(s), m]
+                    for n, is_dir, s, m in entries if not is_dir
+                ),
+            }
+            self._append(record)
+            for item in self._files(record):
+                found.put(item)
+
+            children = list(self._children(root, record))
+            with self.lock:
+                state['outstanding'] += len(children)
+            for child in children:
+                pending.put(child)
+
+        def worker():
+            session = None
+            try:
+                session = FtpSession(**self.session_args)
+                for path in iter(pending.get, None):
+                    try:
+                        if not errors:
+                            list_one(session, path)
+                    finally:
+                        finish_one()
+            except Exception as e:
+                fail(e)
+            finally:
+                if session is not None:
+                    session.close()
+
+        threads = [
+            Thread(target=worker, daemon=True) for _ in range(self.connections)
+        ]
+        for thread in threads:
+            thread.start()
+
+        yield from iter(found.get, None)
+
+        for thread in threads:
+            thread.join()
+
+        if errors:
+            raise errors[0]
+        if not state['failed']:
+            self._append({'complete': True})
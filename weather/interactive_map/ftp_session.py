@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from ftplib import FTP, all_errors, error_perm
+from io import BytesIO
+import json
+from multiprocessing import Value
+from time import sleep
+
+
+HOST = 'ftp.ceda.ac.uk'
+
+
+def make_counters():
+    # Shared between worker processes, so we can see how many connections we
+    # needed for the files we fetched
+    return {'connections': Value('i', 0), 'files': Value('i', 0)}
+
+
+def read_counters(counters):
+    return {name: value.value for name, value in counters.items()}
+
+
+class FtpSession:
+    # A long-lived FTP connection that reconnects (with backoff) when
+    # something goes wrong, rather than logging in afresh for every file
+    def __init__(self, host=HOST, port=21, credentials='credentials.json',
+                 retries=3, backoff=1, counters=None):
+        with open(credentials, 'r') as creds:
+            self.login_details = json.load(creds)
+
+        self.host = host
+        self.port = port
+        self.retries = retries
+        self.backoff = backoff
+        self.counters = counters
+        self.ftp = None
+
+    def _count(self, name):
+        if self.counters is not None:
+            with self.counters[name].get_lock():
+                self.counters[name].value += 1
+
+    def connect(self):
+        self.close()
+        ftp = FTP()
+        ftp.connect(self.host, self.port)
+        ftp.login(**self.login_details)
+        self.ftp = ftp
+        self._count('connections')
+        return ftp
+
+    def close(self):
+        if self.ftp is None:
+            return
+        try:
+            self.ftp.quit()
+        except all_errors:
+            self.ftp.close()
+        self.ftp = None
+
+    def _retry(self, func):
+        for attempt in range(self.retries + 1):
+            try:
+                if self.ftp is None:
+                    self.connect()
+                return func(self.ftp)
+            except all_errors:
+                # Throw the connection away, it's probably dead
+                self.close()
+                if attempt == self.retries:
+                    raise
+                sleep(self.backoff * 2 ** attempt)
+
+    def download(self, path):
+        def fetch(ftp):
+            # Start with a fresh buffer each attempt so a failed transfer
+            # doesn't leave partial data behind
+            download = BytesIO()
+            # Based on https://stackoverflow.com/a/48817105
+            ftp.retrbinary(f'RETR {path}', download.write)
+            download.seek(0)
+            return download
+
+        download = self._retry(fetch)
+        self._count('files')
+        return download
+
+    def listing(self, path):
+        # (name, is_dir, size, mtime) for everything in a directory. MLSD gives
+        # us all of that in one go; if the server doesn't support it, fall
+        # back to a plain listing and guess directories from the lack of an
+        # extension.
+        def mlsd(ftp):
+            try:
+                return [
+                    (name, facts.get('type') == 'dir', facts.get('size'),
+                     facts.get('modify'))
+                    for name, facts in ftp.mlsd(
+                        path, facts=['type', 'size', 'modify']
+                    )
+                    if facts.get('type') in ('dir', 'file')
+                ]
+            except error_perm:
+                return [
+                    (name.rsplit('/', 1)[-1], '.' not in name, None, None)
+                    for name in ftp.nlst(path)
+                ]
+
+        return self._retry(mlsd)
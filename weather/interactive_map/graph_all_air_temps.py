@@ -1,12 +1,24 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
-from ftplib import FTP
+from argparse import ArgumentParser
+from ftplib import all_errors
 from io import BytesIO
-import json
-from multiprocessing import Pool
+from multiprocessing import Pool, cpu_count
 import os
+import posixpath
+from queue import Queue
+from threading import BoundedSemaphore, Thread
+from time import perf_counter
 
+from crawler import ListingCrawler
+from ftp_session import FtpSession, HOST, make_counters, read_counters
+import instrument
+from instrument import stage
+from manifest import Manifest, hash_bytes
 from midas import MidasData
+from midas_cache import MidasCache
+from streaming import stream_monthly
+from validation import Rejection, RejectionReport, check_hours
 
 
 SOURCE = (
@@ -15,77 +27,464 @@ SOURCE = (
     'For more information on these graphs visit ruszkow.ski/posts/weather'
 )
 
+DATASET = 'dataset-version-201901'
+DATA_ROOT = 'badc/ukmo-midas-open/data/uk-hourly-weather-obs/' + DATASET
 
-def connect_ftp():
-    with open('credentials.json', 'r') as creds:
-        login_details = json.load(creds)
+# Changing anything here means every graph gets redrawn on the next run. Bump
+# STYLE_VERSION after changing how the graphs look in midas.py.
+STYLE_VERSION = 1
+HOURS = (7, 18)
+PLOT_PARAMS = dict(
+    hue='Mean Temp', value='air_temperature',
+    hue_label='Mean', value_format=u'{:.2f}\u00b0',
+    x_label=u'Temperature (\u00b0C)', attribution=SOURCE,
+    facet_params=dict(aspect=14, height=.8, xlim=(-15, 30)),
+    shape_params=dict(bw=.4),
+    outline_params=dict(bw=.4)
+)
+MANIFEST_PARAMS = dict(PLOT_PARAMS, hours=HOURS, style=STYLE_VERSION)
 
-    ftp = FTP('ftp.ceda.ac.uk')
-    ftp.login(**login_details)
-    return ftp
+# Rejections at these stages come from the file's contents, so they'll come
+# out the same until the file (or the settings) change
+FINAL_STAGES = ('validate', 'parse')
 
 
-def threaded_site(directory, csv_file, folder, sub, sub_pretty):
-    ftp = connect_ftp()
-    ftp.cwd(directory)
-    year = csv_file[-8:-4]
-    # Based on https://stackoverflow.com/a/48817105
-    download = BytesIO()
-    ftp.retrbinary("RETR {}".format(csv_file), download.write)
-    download.seek(0)
+def descend(parts):
+    # <county>/<station>/qc-version-1 - nothing else under the root is data
+    return len(parts) <= 2 or (len(parts) == 3 and parts[2] == 'qc-version-1')
 
-    # Set up the object
-    md = MidasData(download)
-    md.data = md.data[md.data['Hour'].between(7, 18)]
 
-    # Quit if we don't have the full 12 hours
-    if not md.data['Hour'].nunique() == 12:
-        print('Not enough hours:', year)
-        return None
-    md.data['Mean Temp'] = (
-        md.data.groupby('Month')['air_temperature'].transform('mean')
+def crawl(crawler, root, refresh=False):
+    # Yields (folder, sub, year, path, size, mtime) as the listing goes, so
+    # downloads can start while we're still listing the rest
+    for directory, name, size, mtime in crawler.crawl(root, refresh=refresh):
+        parts = posixpath.relpath(directory, root).split('/')
+        if len(parts) != 3 or not name.endswith('.csv'):
+            continue
+        folder, sub, _ = parts
+        yield folder, sub, name[-8:-4], f'{directory}/{name}', size, mtime
+
+
+def cache_key(folder, sub, year):
+    return DATASET, folder, sub, year
+
+
+def output_path(folder, sub, year):
+    return os.path.join(
+        'Graphs', folder, sub, f'{year} Daytime Air Temperatures.png'
     )
 
-    output_folder = os.path.join('Graphs', folder, sub)
+
+def fetch_worker(tasks, ready, cache, manifest, session, streaming=False,
+                 validate=True):
+    # Network stage - runs in a thread. Downloads each file (unless the cache
+    # already has it) and hands the raw bytes on to the processing stage.
+    for folder, sub, year, csv_path, size, mtime in iter(tasks.get, None):
+        output = output_path(folder, sub, year)
+
+        # Same listing details as last time - no need to download at all
+        if (manifest is not None and size is not None
+                and manifest.is_current(output, size, mtime)):
+            continue
+
+        payload = None
+        source_hash = None
+        cached = (
+            cache is not None and size is not None
+            and cache.has(cache_key(folder, sub, year), size, mtime)
+        )
+        if not cached:
+            try:
+                with instrument.task(output), stage('download') as fetch:
+                    payload = session.download(csv_path).getvalue()
+                    fetch.bytes = len(payload)
+            except all_errors as e:
+                print('Download failed:', csv_path, e)
+                continue
+
+            # The listing changed but the contents didn't
+            source_hash = hash_bytes(payload)
+            if manifest is not None and manifest.is_current(
+                    output, source_hash=source_hash):
+                manifest.touch(output, size, mtime)
+                continue
+
+        if manifest is not None:
+            manifest.expect(output, source_hash, size, mtime)
+
+        # Blocks when the buffer is full, which keeps memory use bounded
+        ready.put((
+            folder, sub, year, payload, size, mtime, cache, streaming, validate
+        ))
+
+    session.close()
+
+
+def start_fetchers(task_source, ready, cache, manifest, count, session_args,
+                   streaming=False, validate=True):
+    # Returns the threads and a list that gets any error from the listing,
+    # which the caller should raise once the fetchers are done
+    tasks = Queue(maxsize=count * 2)
+    errors = []
+
+    def produce():
+        try:
+            for task in task_source:
+                tasks.put(task)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            # Always let the fetchers know there's nothing more coming
+            for _ in range(count):
+                tasks.put(None)
+
+    threads = [Thread(target=produce, daemon=True)]
+    threads += [
+        Thread(
+            target=fetch_worker, daemon=True,
+            args=(tasks, ready, cache, manifest, FtpSession(**session_args),
+                  streaming, validate)
+        )
+        for _ in range(count)
+    ]
+    for thread in threads:
+        thread.start()
+    return threads, errors
+
+
+def load_site(folder, sub, year, payload, size, mtime, cache):
+    key = cache_key(folder, sub, year)
+
+    # No payload means the fetch stage found it in the cache (or we're
+    # offline)
+    if payload is None:
+        data = cache.get(key, size, mtime) if cache is not None else None
+        return None if data is None else MidasData.from_frame(data)
+
+    md = MidasData(BytesIO(payload), engine='c', columns=['air_temperature'])
+    if cache is not None and size is not None:
+        with stage('cache'):
+            cache.put(key, md.data, size, mtime)
+    return md
+
+
+def prepare_output(folder, sub, year):
+    output = output_path(folder, sub, year)
+    output_folder = os.path.dirname(output)
     if not os.path.isdir(output_folder):
         os.makedirs(output_folder)
+    return output
+
+
+def process_site(folder, sub, year, payload=None, size=None, mtime=None,
+                 cache=None, streaming=False, validate=True):
+    # Returns the graph's path, or a Rejection saying why there isn't one
+    sub_pretty = sub.split('_')[-1].replace('-', ' ').title()
+    title = f'{year} Daytime (7am-7pm) Temperatures\nSite: {sub_pretty}'
+    expected_hours = HOURS[1] - HOURS[0] + 1
+
+    def reject(reason, stage, detail=None):
+        return Rejection(
+            folder, sub, year, reason, stage,
+            None if payload is None else len(payload), detail
+        )
+
+    # Look at just the timestamps first, so files without the full 12 hours
+    # never get parsed properly or drawn
+    if validate and payload is not None:
+        with stage('validate', len(payload)):
+            problem = check_hours(BytesIO(payload), HOURS)
+        if problem is not None:
+            reason, detail = problem
+            return reject(reason, 'validate', detail)
+
+    # Streaming only keeps running monthly summaries, so memory use doesn't
+    # depend on the size of the file. It skips the cache, which holds full
+    # frames.
+    if streaming and payload is not None:
+        with stage('stream', len(payload)):
+            summary = stream_monthly(
+                BytesIO(payload), value=PLOT_PARAMS['value'], hours=HOURS
+            )
+        if summary.n_hours != expected_hours:
+            return reject('missing hours', 'parse', summary.n_hours)
+        if not summary.count.any():
+            return reject('no values', 'parse', PLOT_PARAMS['value'])
+
+        output = prepare_output(folder, sub, year)
+        summary.monthly_ridge_plot(
+            title=title, output_path=output, **PLOT_PARAMS
+        )
+        return output
+
+    # Set up the object
+    md = load_site(folder, sub, year, payload, size, mtime, cache)
+    if md is None:
+        return reject('not cached', 'cache')
+    md.data = md.data[md.data['Hour'].between(*HOURS)]
+
+    # Quit if we don't have the full 12 hours
+    if not md.data['Hour'].nunique() == expected_hours:
+        return reject('missing hours', 'parse', int(md.data['Hour'].nunique()))
+    # Hours with a row but no reading leave nothing to draw
+    if not md.data[PLOT_PARAMS['value']].notna().any():
+        return reject('no values', 'parse', PLOT_PARAMS['value'])
+    with stage('group'):
+        md.data['Mean Temp'] = (
+            md.data.groupby('Month')['air_temperature'].transform('mean')
+        )
+
+    output = prepare_output(folder, sub, year)
+    md.monthly_ridge_plot(title=title, output_path=output, **PLOT_PARAMS)
+    return output
+
+
+def timed_site(*args):
+    # Any instrumentation events go back to the main process with the result
+    folder, sub, year = args[:3]
+    start = perf_counter()
+    with instrument.task(output_path(folder, sub, year)):
+        result = process_site(*args)
+    return os.getpid(), start, perf_counter(), result, instrument.drain()
+
+
+def make_pool(jobs):
+    # Make this before starting any threads. The workers are forked, and a
+    # fork taken while another thread holds a lock (a queue's, an FTP
+    # session's, instrument's) copies the lock held, along with anything
+    # half-written under it.
+    #
+    # Workers need switching on too if they weren't forked from us
+    initializer = instrument.enable if instrument.enabled() else None
+    return Pool(processes=jobs, initializer=initializer)
+
+
+def run_pipeline(ready, pool, in_flight, manifest=None, report=None,
+                 save_every=50):
+    # CPU stage - parse and render in the process pool from make_pool. The
+    # semaphore stops us pulling more payloads off the queue than the pool
+    # can work on, so the pool's own (unbounded) task queue never holds much.
+    slots = BoundedSemaphore(in_flight)
+    timings = []
+
+    def done(result):
+        *timing, events = result
+        timings.append(timing)
+        instrument.collect(events)
+        output = timing[-1]
+        if isinstance(output, Rejection):
+            if report is not None:
+                report.add(output)
+            if manifest is not None:
+                path = output_path(output.folder, output.sub, output.year)
+                if output.stage in FINAL_STAGES:
+                    manifest.complete(path, rejected=output.reason)
+                else:
+                    manifest.discard(path)
+        elif manifest is not None:
+            manifest.complete(output)
 
-    md.monthly_ridge_plot(
-        hue='Mean Temp', value='air_temperature',
-        title=f'{year} Daytime (7am-7pm) Temperatures\nSite: {sub_pretty}',
-        hue_label='Mean', value_format=u'{:.2f}\u00b0',
-        x_label=u'Temperature (\u00b0C)', attribution=SOURCE,
-        output_path=os.path.join(output_folder,
-                                 f'{year} Daytime Air Temperatures.png'),
-        facet_params=dict(aspect=14, height=.8, xlim=(-15, 30)),
-        shape_params=dict(bw=.4),
-        outline_params=dict(bw=.4)
+        # Save as we go so a crash doesn't lose the whole run's progress
+        if manifest is not None and len(timings) % save_every == 0:
+            manifest.save()
+        slots.release()
+
+    def failed(error):
+        print('Processing failed:', repr(error))
+        slots.release()
+
+    with pool:
+        for item in iter(ready.get, None):
+            slots.acquire()
+            pool.apply_async(
+                timed_site, item, callback=done, error_callback=failed
+            )
+        pool.close()
+        pool.join()
+
+    if manifest is not None:
+        manifest.save()
+    return timings
+
+
+def summarise(timings, jobs, wall):
+    # Idle time is whatever the workers could have spent processing files but
+    # didn't - mostly waiting on downloads
+    busy = sum(end - start for _, start, end, _ in timings)
+    available = jobs * wall
+    idle = available - busy
+
+    print(
+        f'{len(timings)} files in {wall:.1f}s '
+        f'({len(timings) / wall:.2f} files/sec) with {jobs} workers'
+    )
+    print(
+        f'Workers busy {busy:.1f}s, idle {idle:.1f}s '
+        f'({idle / available:.0%} of available time)'
     )
 
 
-if __name__ == '__main__':
-    ftp = connect_ftp()
+def main(argv=None):
+    parser = ArgumentParser(
+        description='Draw daytime temperature ridge plots for every MIDAS site'
+    )
+    parser.add_argument(
+        '--cache', default='Cache',
+        help='Folder for the parsed station-year cache'
+    )
+    parser.add_argument(
+        '--cache-size', type=float, default=2,
+        help='Maximum size of the cache in GB'
+    )
+    parser.add_argument(
+        '--no-cache', action='store_true', help="Don't read or write the cache"
+    )
+    parser.add_argument(
+        '--force', action='store_true',
+        help="Redraw every graph, even if its source and settings haven't changed"
+    )
+    parser.add_argument(
+        '--manifest', default=os.path.join('Graphs', 'manifest.json'),
+        help='Where to record what has already been drawn'
+    )
+    parser.add_argument(
+        '--offline', action='store_true',
+        help='Only draw what is already cached, without connecting to the FTP'
+    )
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=21)
+    parser.add_argument('--root', default=DATA_ROOT)
+    parser.add_argument('--credentials', default='credentials.json')
+    parser.add_argument(
+        '--listing', default='listing.jsonl',
+        help='Local copy of the FTP directory listing'
+    )
+    parser.add_argument(
+        '--refresh', action='store_true',
+        help='Throw away the saved listing and crawl the FTP again'
+    )
+    parser.add_argument(
+        '--crawlers', type=int, default=4,
+        help='Number of connections used to list the FTP'
+    )
+    parser.add_argument(
+        '--jobs', type=int, default=cpu_count(),
+        help='Number of worker processes for parsing and drawing'
+    )
+    parser.add_argument(
+        '--fetchers', type=int, default=4,
+        help='Number of concurrent downloads'
+    )
+    parser.add_argument(
+        '--buffer', type=int, default=16,
+        help='Maximum number of downloaded files waiting to be processed'
+    )
+    parser.add_argument(
+        '--streaming', action='store_true',
+        help='Parse downloads in chunks, keeping only monthly summaries'
+    )
+    parser.add_argument(
+        '--no-validate', action='store_true',
+        help="Don't check each file's hours before parsing it in full"
+    )
+    parser.add_argument(
+        '--report', default=os.path.join('Graphs', 'rejected.jsonl'),
+        help='Where to add the station-years that were not drawn, and why'
+    )
+    parser.add_argument(
+        '--profile', metavar='TRACE',
+        help='Time every stage of every file, writing a Chrome trace here and '
+             'a summary table alongside it'
+    )
+    parser.add_argument(
+        '--retries', type=int, default=3,
+        help='How many times to reconnect and retry a failed download'
+    )
+    args = parser.parse_args(argv)
+
+    if args.offline and args.no_cache:
+        parser.error('--offline needs the cache')
+
+    cache = None
+    if not args.no_cache:
+        cache = MidasCache(args.cache, max_bytes=int(args.cache_size * 1024 ** 3))
 
-    ftp.cwd(
-        'badc/ukmo-midas-open/data/uk-hourly-weather-obs/dataset-version-201901'
+    # Even when forcing, start a fresh manifest so the next run can be
+    # incremental
+    manifest = Manifest(
+        args.manifest, dict(MANIFEST_PARAMS, streaming=args.streaming)
     )
+    if args.force:
+        manifest.entries.clear()
 
-    for folder in ftp.nlst():
-        if '.' in folder:
-            continue
-        print(folder)
-        ftp.cwd(folder)
-        for sub in ftp.nlst():
-            sub_pretty = sub.split('_')[-1].replace('-', ' ').title()
-            print(sub_pretty)
-            ftp.cwd(sub + '/qc-version-1')
-            func_args = [
-                (ftp.pwd(), csv_file, folder, sub, sub_pretty)
-                for csv_file in ftp.nlst()
-            ]
-
-            with Pool(processes=4) as pool:
-                results = pool.starmap(threaded_site, func_args)
-
-            ftp.cwd('../..')
-        ftp.cwd('..')
+    if args.profile:
+        instrument.enable()
+
+    counters = make_counters()
+    ready = Queue(maxsize=args.buffer)
+    fetch_errors = []
+    pool = make_pool(args.jobs)
+
+    if args.offline:
+        def produce_cached():
+            for folder, sub, year in cache.entries(DATASET):
+                output = output_path(folder, sub, year)
+                if manifest.is_current(output):
+                    continue
+                manifest.expect(output)
+                ready.put((folder, sub, year, None, None, None, cache))
+            ready.put(None)
+
+        Thread(target=produce_cached, daemon=True).start()
+    else:
+        session_args = dict(
+            host=args.host, port=args.port, credentials=args.credentials,
+            retries=args.retries, counters=counters
+        )
+        crawler = ListingCrawler(
+            args.listing, session_args, connections=args.crawlers,
+            descend=descend
+        )
+        root = posixpath.join('/', args.root)
+        fetchers, fetch_errors = start_fetchers(
+            crawl(crawler, root, args.refresh), ready, cache, manifest, args.fetchers,
+            session_args, streaming=args.streaming,
+            validate=not args.no_validate
+        )
+
+        # Let the processing stage know when the last download is in
+        def finish():
+            for thread in fetchers:
+                thread.join()
+            ready.put(None)
+
+        Thread(target=finish, daemon=True).start()
+
+    report = RejectionReport(args.report)
+    start = perf_counter()
+    timings = run_pipeline(
+        ready, pool, in_flight=args.jobs * 2, manifest=manifest,
+        report=report
+    )
+    wall = perf_counter() - start
+    report.close()
+
+    if cache is not None:
+        cache.evict()
+    if fetch_errors:
+        raise fetch_errors[0]
+
+    summarise(timings, args.jobs, wall)
+    if args.profile:
+        print(instrument.write_report(args.profile))
+    report.summarise()
+
+    counts = read_counters(counters)
+    print(
+        f"{counts['connections']} FTP connections opened for "
+        f"{counts['files']} files fetched"
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from collections import defaultdict
+from contextlib import contextmanager
+import json
+import os
+import sys
+from threading import Lock, get_ident, local
+from time import perf_counter
+
+try:
+    import resource
+except ImportError:
+    # Not on Windows - we just won't have memory figures there
+    resource = None
+
+
+# Off unless enable() is called, in which case stage() records how long each
+# stage of each file took, the process's peak RSS by the end of it and how
+# many bytes it handled. Events are kept per process: workers hand theirs
+# back with drain(), and the main process gathers them with collect().
+_enabled = False
+_events = []
+_lock = Lock()
+_state = local()
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def enabled():
+    return _enabled
+
+
+def peak_rss():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _stack():
+    if not hasattr(_state, 'stack'):
+        _state.stack = []
+        _state.task = None
+    return _state.stack
+
+
+@contextmanager
+def task(name):
+    # Everything recorded inside belongs to this file
+    _stack()
+    previous, _state.task = _state.task, name
+    try:
+        yield
+    finally:
+        _state.task = previous
+
+
+class Stage:
+    # Handed to the body of a stage so it can say how many bytes it handled
+    # once it knows
+    def __init__(self, name):
+        self.name = name
+        self.bytes = None
+        self.children = 0.
+
+
+@contextmanager
+def stage(name, nbytes=None):
+    if not _enabled:
+        yield Stage(name)
+        return
+
+    stack = _stack()
+    current = Stage(name)
+    current.bytes = nbytes
+    stack.append(current)
+    start = perf_counter()
+    try:
+        yield current
+    finally:
+        end = perf_counter()
+        stack.pop()
+        if stack:
+            stack[-1].children += end - start
+
+        event = dict(
+            name=name, task=_state.task, pid=os.getpid(), tid=get_ident(),
+            start=start, duration=end - start,
+            self_time=end - start - current.children, depth=len(stack),
+            peak_rss=peak_rss(), bytes=current.bytes
+        )
+        with _lock:
+            _events.append(event)
+
+
+def drain():
+    # This process's events since the last drain
+    with _lock:
+        events = list(_events)
+        _events.clear()
+    return events
+
+
+def collect(events):
+    with _lock:
+        _events.extend(events)
+
+
+def summary_table(events):
+    totals = defaultdict(lambda: dict(
+        count=0, wall=0., self_time=0., peak=0, bytes=0
+    ))
+    order = []
+    for event in events:
+        row = totals[event['name']]
+        if not row['count']:
+            order.append(event['name'])
+        row['count'] += 1
+        row['wall'] += event['duration']
+        row['self_time'] += event['self_time']
+        row['peak'] = max(row['peak'], event['peak_rss'] or 0)
+        row['bytes'] += event['bytes'] or 0
+
+    lines = [
+        f"{'stage':<12}{'files':>7}{'total s':>10}{'self s':>10}"
+        f"{'mean ms':>10}{'peak RSS MB':>13}{'MB':>10}"
+    ]
+    for name in sorted(order, key=lambda n: -totals[n]['self_time']):
+        row = totals[name]
+        lines.append(
+            f"{name:<12}{row['count']:>7}{row['wall']:>10.2f}"
+            f"{row['self_time']:>10.2f}"
+            f"{row['wall'] / row['count'] * 1000:>10.1f}"
+            f"{row['peak'] / 1024 ** 2:>13.0f}"
+            f"{row['bytes'] / 1024 ** 2:>10.1f}"
+        )
+    return '\n'.join(lines)
+
+
+def chrome_trace(events):
+    # Complete ("X") events, which chrome://tracing and Perfetto show as a
+    # flame chart per process and thread. perf_counter uses the same clock in
+    # every process, so the workers line up.
+    origin = min((e['start'] for e in events), default=0)
+    return {
+        'traceEvents': [
+            {
+                'name': e['name'], 'cat': 'midas', 'ph': 'X',
+                'ts': (e['start'] - origin) * 1e6, 'dur': e['duration'] * 1e6,
+                'pid': e['pid'], 'tid': e['tid'],
+                'args': {
+                    'file': e['task'], 'bytes': e['bytes'],
+                    'peak_rss': e['peak_rss'],
+                },
+            }
+            for e in events
+        ],
+        'displayTimeUnit': 'ms',
+    }
+
+
+def write_report(path, events=None):
+    # <path> gets the Chrome trace, and the summary table goes next to it
+    events = drain() if events is None else events
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+
+    with open(path, 'w') as f:
+        json.dump(chrome_trace(events), f)
+
+    table = summary_table(events)
+    with open(os.path.splitext(path)[0] + '.txt', 'w') as f:
+        f.write(table + '\n')
+    return table
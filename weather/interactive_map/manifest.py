@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from hashlib import sha256
+import json
+import os
+from threading import Lock
+
+
+def hash_bytes(payload):
+    return sha256(payload).hexdigest()
+
+
+def hash_params(params):
+    return hash_bytes(json.dumps(params, sort_keys=True, default=str).encode())
+
+
+class Manifest:
+    # Records, for every graph we've drawn, a hash of the source file and of
+    # the plotting parameters used. If neither has changed (and the graph is
+    # still on disk), there's no need to draw it again.
+    #
+    # We also keep the size and modification time from the FTP listing, so an
+    # unchanged file can be skipped without downloading it to hash it.
+    #
+    # Station-years that were rejected (too few hours, unreadable) are kept
+    # the same way, with the reason instead of a graph, so an unchanged file
+    # isn't downloaded and checked again on every run.
+    def __init__(self, path, params):
+        self.path = path
+        self.params = hash_params(params)
+        self.entries = dict()
+        self.pending = dict()
+        self.lock = Lock()
+
+        if os.path.isfile(path):
+            with open(path, 'r') as f:
+                self.entries = json.load(f)
+
+    def is_current(self, output, size=None, mtime=None, source_hash=None):
+        with self.lock:
+            entry = self.entries.get(output)
+
+        if not entry or entry['params'] != self.params:
+            return False
+        if not entry.get('rejected') and not os.path.isfile(output):
+            return False
+
+        if source_hash is not None:
+            return entry['source'] == source_hash
+        if size is not None:
+            return (entry['size'], entry['mtime']) == (size, mtime)
+
+        # Nothing to compare against (e.g. drawing from the cache offline), so
+        # go on the parameters alone
+        return True
+
+    def record(self, output, source_hash=None, size=None, mtime=None,
+               rejected=None):
+        with self.lock:
+            previous = self.entries.get(output, dict())
+            self.entries[output] = {
+                'source': source_hash or previous.get('source'),
+                'size': size,
+                'mtime': mtime,
+                'params': self.params,
+                'rejected': rejected,
+            }
+
+    def touch(self, output, size=None, mtime=None):
+        # The listing changed but the contents didn't, so keep everything
+        # else (including any rejection) and just note the new listing
+        with self.lock:
+            entry = self.entries.get(output)
+            if entry is not None:
+                entry.update(size=size, mtime=mtime)
+
+    def expect(self, output, source_hash=None, size=None, mtime=None):
+        # Note what we're about to draw, so we can record it once it's done
+        with self.lock:
+            self.pending[output] = (source_hash, size, mtime)
+
+    def complete(self, output, rejected=None):
+        # Drawn, or rejected for a reason that's down to the file itself
+        with self.lock:
+            details = self.pending.pop(output, (None, None, None))
+        self.record(output, *details, rejected=rejected)
+
+    def discard(self, output):
+        # Neither drawn nor rejected for good (e.g. not in the cache offline),
+        # so leave it to be tried again
+        with self.lock:
+            self.pending.pop(output, None)
+
+    def save(self):
+        with self.lock:
+            entries = dict(self.entries)
+
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(entries, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -1,95 +1,216 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 from calendar import month_abbr
+from functools import partial
+import os
+from pathlib import Path
+import sys
+
+# Shared rendering helpers live at the top of the repo. Import them before
+# anything else pulls in matplotlib, so we're on the Agg backend throughout.
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from common.render import get_template, render_many  # noqa: E402
+
+import matplotlib.patheffects as mpe  # noqa: E402
+import pandas as pd  # noqa: E402
+import seaborn as sns  # noqa: E402
+
+from density import grouped_density  # noqa: E402
+from instrument import stage  # noqa: E402
 
-import matplotlib.patheffects as mpe
-import matplotlib.pyplot as plt
-import pandas as pd
-import seaborn as sns
 sns.set(
     style='white', context='talk',
     rc={'axes.facecolor': (0, 0, 0, 0)}
 )
 
 
-class MidasData:
-    def __init__(self, csv_file):
-        self.data = pd.read_csv(
-            csv_file, skiprows=280, parse_dates=['ob_time'],
-            dayfirst=True, skipfooter=1, engine='python'
-        )
+MONTHS = month_abbr[1:]
 
-        self.data['Hour'] = self.data['ob_time'].dt.hour
+# MIDAS files are BADC-CSV: a block of metadata, a line reading "data", the
+# column header, the observations and finally a line reading "end data".
+DATA_MARKER = 'data'
+DEFAULT_HEADER_ROWS = 280
+OB_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
 
-        # Get the month name and average temperature
-        self.data['Month'] = pd.Categorical(
-            self.data['ob_time'].dt.strftime('%b'), categories=month_abbr[1:],
-            ordered=True
-        )
+# Compact dtypes for the observation columns we actually use. Anything not
+# listed here is left for pandas to infer.
+COLUMN_DTYPES = {
+    'air_temperature': 'float32',
+    'dewpoint': 'float32',
+    'wetb_temp': 'float32',
+    'rltv_hum': 'float32',
+    'msl_pressure': 'float32',
+    'stn_pres': 'float32',
+    'wind_speed': 'float32',
+    'wind_direction': 'float32',
+    'visibility': 'float32',
+    'cld_ttl_amt_id': 'float32',
+}
 
-    def monthly_ridge_plot(self, hue, value, title, hue_label, x_label,
-                           attribution, output_path, value_format='{}',
-                           palette='plasma', background_colour='whitesmoke',
-                           hspace=-.4, bottom_space=.12,
-                           facet_params=None, shape_params=None,
-                           outline_params=None):
 
-        _fp = facet_params.copy() if facet_params else dict()
-        _sp = shape_params.copy() if shape_params else dict()
-        _op = outline_params.copy() if outline_params else dict()
+def _scan_for_marker(handle, limit):
+    for i, line in enumerate(handle):
+        if i >= limit:
+            break
+        if isinstance(line, bytes):
+            line = line.decode('latin-1')
+        if line.strip().lower() == DATA_MARKER:
+            return i + 1
+    return DEFAULT_HEADER_ROWS
 
-        g = sns.FacetGrid(
-            self.data, row='Month', hue=hue, palette=palette, **_fp
-        )
 
-        g.map(
-            sns.kdeplot, value, clip_on=False, shade=True, alpha=1, lw=0, **_sp
+def find_header_row(csv_file, limit=2000):
+    # Number of lines before the column header, found by looking for the
+    # "data" marker rather than trusting a fixed offset
+    if hasattr(csv_file, 'read'):
+        start = csv_file.tell()
+        try:
+            return _scan_for_marker(csv_file, limit)
+        finally:
+            csv_file.seek(start)
+
+    with open(csv_file, 'rb') as handle:
+        return _scan_for_marker(handle, limit)
+
+
+def add_time_fields(data):
+    # Parse with an explicit format so pandas can use its fast path. The
+    # "end data" footer doesn't parse, so it drops out here too.
+    ob_time = pd.to_datetime(
+        data['ob_time'], format=OB_TIME_FORMAT, errors='coerce'
+    )
+    keep = ob_time.notna()
+    if not keep.all():
+        data = data[keep].copy()
+        ob_time = ob_time[keep]
+
+    data['ob_time'] = ob_time
+    data['Hour'] = ob_time.dt.hour.astype('int8')
+    data['Month'] = pd.Categorical.from_codes(
+        ob_time.dt.month.to_numpy() - 1, categories=MONTHS, ordered=True
+    )
+    return data
+
+
+def read_midas_csv(csv_file, columns=None, engine='c'):
+    skiprows = find_header_row(csv_file)
+
+    usecols = None
+    dtype = None
+    if columns is not None:
+        usecols = list(dict.fromkeys(['ob_time', *columns]))
+        dtype = {c: COLUMN_DTYPES[c] for c in usecols if c in COLUMN_DTYPES}
+
+    # The C parser pads the short footer line out with NaNs, but pyarrow
+    # treats it as malformed. Newer pandas also ignores skiprows for pyarrow
+    # and only skips as far as the header row, so give it that instead.
+    if engine == 'pyarrow':
+        skip = dict(header=skiprows, on_bad_lines='skip')
+    else:
+        skip = dict(skiprows=skiprows)
+
+    with stage('parse'):
+        data = pd.read_csv(
+            csv_file, usecols=usecols, dtype=dtype, engine=engine, **skip
         )
-        if 'lw' not in _op.keys():
-            _op['lw'] = 3
+    with stage('datetimes'):
+        return add_time_fields(data)
 
-        g.map(
-            sns.kdeplot, value, clip_on=False, color=background_colour, **_op
+
+def density_drawer(densities, background_colour, fill_params,
+                   outline_params):
+    # Draw a month's fill and outline from precomputed densities
+    def draw_month(ax, i, colour):
+        y = densities.density[i]
+        ax.fill_between(
+            densities.grid, 0, y, color=colour, clip_on=False, **fill_params
+        )
+        ax.plot(
+            densities.grid, y, color=background_colour, clip_on=False,
+            **outline_params
         )
 
-        # Add the baseline lines
-        g.map(plt.axhline, y=0, lw=_op['lw'], clip_on=False)
-
-        # Define and use a simple function to label the plot in axes coordinates
-        def label(x, color, label):
-            # 'Label' in this instance passes the hue value
-            ax = plt.gca()
-            ax.text(
-                0, .2, x.iloc[0], fontweight='bold', color=color,
-                ha='left', va='center', transform=ax.transAxes,
-                path_effects=[mpe.withStroke(linewidth=5, foreground='white')]
-            )
-            ax.text(
-                1, .2, value_format.format(float(label)), fontweight='bold',
-                color=color, ha='right', va='center', transform=ax.transAxes,
-                path_effects=[mpe.withStroke(linewidth=5, foreground='white')]
-            )
+    return draw_month
 
-        g.map(label, 'Month')
 
-        # Set the subplots to overlap and add space for the attribution
-        g.fig.subplots_adjust(hspace=hspace, bottom=bottom_space)
+def ridge_plot(month_hues, draw_month, title, hue_label, x_label,
+               attribution, output_path, value_format='{}', palette='plasma',
+               background_colour='whitesmoke', hspace=-.4, bottom_space=.12,
+               facet_params=None, baseline_lw=3, reuse=False):
+    # month_hues has one hue value per month (NaN for months with no data),
+    # and draw_month(ax, month index, colour) draws that month's shape.
+    # reuse draws on this process's kept figure instead of a new one.
+    _fp = facet_params.copy() if facet_params else dict()
+
+    # One row per month, laid out like seaborn's FacetGrid would
+    height = _fp.pop('height', 3)
+    aspect = _fp.pop('aspect', 1)
+    xlim = _fp.pop('xlim', None)
+
+    template = partial(
+        get_template, 'monthly_ridge', reuse=reuse,
+        figsize=(aspect * height, height * len(MONTHS)),
+        nrows=len(MONTHS), sharex=True, sharey=True
+    )
+
+    # Colour each month by its hue value, in order of those values
+    month_hues = pd.Series(month_hues, index=MONTHS)
+    levels = sorted(month_hues.dropna().unique())
+    colours = dict(zip(levels, sns.color_palette(palette, len(levels))))
+
+    label_effects = [mpe.withStroke(linewidth=5, foreground='white')]
+
+    def draw(template, _):
+        with stage('layout'):
+            return layout(template)
 
-        # Remove axes details that don't play well with overlap
-        g.set_titles('')
-        g.set(yticks=[])
-        g.despine(bottom=True, left=True)
+    def layout(template):
+        fig = template.figure
+        axes = template.axes[:, 0]
 
-        mid = (plt.gcf().subplotpars.right + plt.gcf().subplotpars.left) / 2
+        for i, (ax, month) in enumerate(zip(axes, MONTHS)):
+            hue_value = month_hues[month]
+            if not pd.isnull(hue_value):
+                colour = colours[hue_value]
+                draw_month(ax, i, colour)
 
-        plt.suptitle(
+                # Add the baseline lines
+                ax.axhline(y=0, lw=baseline_lw, clip_on=False, color=colour)
+
+                # Label the plot in axes coordinates
+                ax.text(
+                    0, .2, month, fontweight='bold', color=colour,
+                    ha='left', va='center', transform=ax.transAxes,
+                    path_effects=label_effects
+                )
+                ax.text(
+                    1, .2, value_format.format(float(hue_value)),
+                    fontweight='bold', color=colour, ha='right', va='center',
+                    transform=ax.transAxes, path_effects=label_effects
+                )
+
+            # Remove axes details that don't play well with overlap
+            if xlim is not None:
+                ax.set_xlim(xlim)
+            ax.set(yticks=[], xlabel='', ylabel='')
+            for spine in ax.spines.values():
+                spine.set_visible(False)
+            ax.label_outer()
+
+        # Set the subplots to overlap and add space for the attribution
+        fig.tight_layout()
+        fig.subplots_adjust(hspace=hspace, bottom=bottom_space)
+
+        mid = (fig.subplotpars.right + fig.subplotpars.left) / 2
+
+        fig.suptitle(
             title, fontweight='bold',
             va='center', x=mid
         )
 
         # Add the headers for the labels
-        first_ax = g.axes.flatten()[0]
-        last_ax = g.axes.flatten()[-1]
+        first_ax = axes[0]
+        last_ax = axes[-1]
 
         first_ax.text(
             0, .6, 'Month', fontweight='bold', color='k',
@@ -103,16 +224,109 @@ class MidasData:
         # Add an x label
         last_ax.set_xlabel(x_label)
 
-        plt.text(
-            plt.gcf().subplotpars.left, 0, attribution,
+        last_ax.text(
+            fig.subplotpars.left, 0, attribution,
             fontsize='xx-small', style='italic', ha='left', va='baseline',
             alpha=.5,
-            transform=plt.gcf().transFigure
+            transform=fig.transFigure
         )
 
         # remember to set facecolor so it actually saves it out
-        plt.savefig(
-            output_path, bbox_inches='tight', facecolor=background_colour
+        return dict(bbox_inches='tight', facecolor=background_colour)
+
+    # Drawing is timed as "layout"; what's left of "save" is rasterising and
+    # PNG encoding
+    with stage('save') as saving:
+        (_, seconds), = render_many([(output_path, None)], draw, template)
+        saving.bytes = os.path.getsize(output_path)
+    return seconds
+
+
+class MidasData:
+    def __init__(self, csv_file, engine='python', columns=None):
+        if engine != 'python':
+            # Fast path - find the header ourselves so we can use the C (or
+            # pyarrow) parser, and only read the columns we need
+            self.data = read_midas_csv(csv_file, columns=columns, engine=engine)
+            return
+
+        self.data = pd.read_csv(
+            csv_file, skiprows=280, skipfooter=1, engine='python'
+        )
+        # With dayfirst=True and no format, newer pandas guesses the format
+        # from the first value and leaves the column as strings once a day
+        # doesn't fit it
+        self.data['ob_time'] = pd.to_datetime(
+            self.data['ob_time'], format=OB_TIME_FORMAT
+        )
+
+        self.data['Hour'] = self.data['ob_time'].dt.hour
+
+        # Get the month name and average temperature
+        self.data['Month'] = pd.Categorical(
+            self.data['ob_time'].dt.strftime('%b'), categories=MONTHS,
+            ordered=True
         )
 
-        plt.close()
+    @classmethod
+    def from_frame(cls, data):
+        # Wrap an already-parsed frame, e.g. one loaded from the cache
+        md = cls.__new__(cls)
+        md.data = data
+        return md
+
+    def monthly_ridge_plot(self, hue, value, title, hue_label, x_label,
+                           attribution, output_path, value_format='{}',
+                           palette='plasma', background_colour='whitesmoke',
+                           hspace=-.4, bottom_space=.12,
+                           facet_params=None, shape_params=None,
+                           outline_params=None, kde='builtin',
+                           reuse=False):
+
+        _sp = shape_params.copy() if shape_params else dict()
+        _op = outline_params.copy() if outline_params else dict()
+
+        if 'lw' not in _op.keys():
+            _op['lw'] = 3
+
+        with stage('group'):
+            month_hues = (
+                self.data.groupby('Month')[hue].first().reindex(MONTHS)
+            )
+
+        if kde == 'seaborn':
+            fill_params = dict(dict(alpha=1, lw=0), **_sp)
+
+            def draw_month(ax, i, colour):
+                values = self.data.loc[self.data['Month'] == MONTHS[i], value]
+                sns.kdeplot(
+                    values, ax=ax, clip_on=False, shade=True, color=colour,
+                    **fill_params
+                )
+                sns.kdeplot(
+                    values, ax=ax, clip_on=False, color=background_colour,
+                    **_op
+                )
+        else:
+            # Work out all twelve densities in one go, and draw both the fill
+            # and the outline from that
+            bw = _sp.pop('bw', .4)
+            _op.pop('bw', None)
+            _sp.pop('shade', None)
+            with stage('kde', self.data[value].nbytes):
+                densities = grouped_density(
+                    self.data[value], self.data['Month'].cat.codes,
+                    len(MONTHS), bw=bw
+                )
+            draw_month = density_drawer(
+                densities, background_colour, dict(dict(alpha=1, lw=0), **_sp),
+                _op
+            )
+
+        return ridge_plot(
+            month_hues, draw_month, title, hue_label, x_label, attribution,
+            output_path, value_format=value_format, palette=palette,
+            background_colour=background_colour, hspace=hspace,
+            bottom_space=bottom_space, facet_params=facet_params,
+            baseline_lw=_op['lw'], reuse=reuse
+        )
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+from pathlib import Path
+from uuid import uuid4
+
+import pandas as pd
+
+
+class MidasCache:
+    # Parsed station-years are stored as
+    #   <folder>/<dataset version>/<county>/<station>/<year>.<stamp>.parquet
+    # where the stamp is the size and modification time of the source file
+    # from the FTP listing. A changed source gives a different stamp, so stale
+    # entries are simply never matched (and get cleared out when seen). Nothing
+    # is shared between entries, so worker processes can read and write
+    # without any locking.
+    def __init__(self, folder='Cache', max_bytes=2 * 1024 ** 3):
+        self.folder = Path(folder)
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def stamp(size, mtime):
+        # FTP modification times can carry fractional seconds - keep the dots
+        # out of the file name
+        return f'{size}-{mtime}'.replace('.', '_')
+
+    def _station_dir(self, dataset_version, county, station):
+        return self.folder / dataset_version / county / station
+
+    def _candidates(self, key):
+        *station_key, year = key
+        return sorted(self._station_dir(*station_key).glob(f'{year}.*.parquet'))
+
+    def get(self, key, size=None, mtime=None):
+        # Without a size and mtime (i.e. offline) we take whatever we have
+        wanted = None if size is None else self.stamp(size, mtime)
+
+        for path in self._candidates(key):
+            stamp = path.name.split('.')[1]
+            if wanted is not None and stamp != wanted:
+                path.unlink()
+                continue
+
+            # Touch the file so eviction knows it's been used recently
+            os.utime(path)
+            return pd.read_parquet(path)
+
+        return None
+
+    def has(self, key, size=None, mtime=None):
+        # Cheap check that doesn't read the file or clear stale entries
+        wanted = None if size is None else self.stamp(size, mtime)
+        return any(
+            wanted is None or path.name.split('.')[1] == wanted
+            for path in self._candidates(key)
+        )
+
+    def put(self, key, data, size, mtime):
+        *station_key, year = key
+        station_dir = self._station_dir(*station_key)
+        station_dir.mkdir(parents=True, exist_ok=True)
+
+        for stale in self._candidates(key):
+            stale.unlink()
+
+        # Write to a temporary name first so readers never see half a file
+        path = station_dir / f'{year}.{self.stamp(size, mtime)}.parquet'
+        tmp_path = station_dir / f'.{uuid4().hex}.tmp'
+        data.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+    def entries(self, dataset_version):
+        # Yield (county, station, year) for everything cached for a version
+        for path in sorted((self.folder / dataset_version).glob('*/*/*.parquet')):
+            yield path.parent.parent.name, path.parent.name, path.name.split('.')[0]
+
+    def evict(self):
+        # Drop least recently used entries until we're back under the limit
+        files = [
+            (path.stat(), path) for path in self.folder.glob('**/*.parquet')
+        ]
+        total = sum(stat.st_size for stat, _ in files)
+
+        removed = 0
+        for stat, path in sorted(files, key=lambda f: f[0].st_mtime):
+            if total <= self.max_bytes:
+                break
+            path.unlink()
+            total -= stat.st_size
+            removed += 1
+
+        return removed
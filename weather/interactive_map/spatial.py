@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from argparse import ArgumentParser
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from midas import find_header_row
+from summary_store import STATS, StationStore
+
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def read_station_metadata(path):
+    # The MIDAS station metadata file is BADC-CSV, like the observations
+    stations = pd.read_csv(path, skiprows=find_header_row(path))
+    stations = stations.dropna(subset=['station_latitude', 'station_longitude'])
+    stations['src_id'] = stations['src_id'].astype(int).map('{:05d}'.format)
+    return stations.reset_index(drop=True)
+
+
+def haversine(lat, lon, lats, lons):
+    lat, lon, lats, lons = map(np.radians, (lat, lon, lats, lons))
+    a = (
+        np.sin((lats - lat) / 2) ** 2
+        + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+class StationIndex:
+    # Stations bucketed into a regular lat/lon grid. Nearest-station and area
+    # lookups only look at the cells around the point of interest, widening
+    # the search ring until the answer can't change.
+    def __init__(self, src_ids, names, lats, lons, cell_size=.5):
+        self.src_ids = np.asarray(src_ids)
+        self.names = np.asarray(names)
+        self.lats = np.asarray(lats, dtype=float)
+        self.lons = np.asarray(lons, dtype=float)
+        self.cell_size = cell_size
+
+        self.cells = dict()
+        for i, cell in enumerate(zip(*self._cell(self.lats, self.lons))):
+            self.cells.setdefault(cell, []).append(i)
+        self.cells = {k: np.array(v) for k, v in self.cells.items()}
+
+    @classmethod
+    def from_metadata(cls, path, cell_size=.5):
+        stations = read_station_metadata(path)
+        return cls(
+            stations['src_id'], stations['station_name'],
+            stations['station_latitude'], stations['station_longitude'],
+            cell_size=cell_size
+        )
+
+    def _cell(self, lat, lon):
+        return (
+            np.floor_divide(lat, self.cell_size).astype(int),
+            np.floor_divide(lon, self.cell_size).astype(int)
+        )
+
+    def _ring(self, row, col, radius):
+        # Station indices in the cells exactly `radius` cells away
+        found = []
+        for r in range(row - radius, row + radius + 1):
+            for c in range(col - radius, col + radius + 1):
+                if max(abs(r - row), abs(c - col)) == radius:
+                    found.extend(self.cells.get((r, c), ()))
+        return found
+
+    def nearest(self, lat, lon, k=1):
+        row, col = self._cell(lat, lon)
+        max_radius = max(
+            max(abs(r - row), abs(c - col)) for r, c in self.cells
+        ) if self.cells else 0
+
+        candidates = []
+        radius = 0
+        while radius <= max_radius:
+            candidates.extend(self._ring(row, col, radius))
+            if len(candidates) >= k:
+                distances = haversine(
+                    lat, lon, self.lats[candidates], self.lons[candidates]
+                )
+                kth = np.sort(distances)[k - 1]
+                # Anything outside this ring is at least `radius` cells away.
+                # A degree of longitude is shortest at the pole-most edge, so
+                # be conservative and use that.
+                edge_lat = np.radians(min(abs(lat) + self.cell_size * radius, 89))
+                reach = (
+                    radius * self.cell_size * np.pi / 180 * EARTH_RADIUS_KM
+                    * np.cos(edge_lat)
+                )
+                if kth <= reach:
+                    break
+            radius += 1
+
+        candidates = np.array(candidates, dtype=int)
+        distances = haversine(
+            lat, lon, self.lats[candidates], self.lons[candidates]
+        )
+        order = np.argsort(distances)[:k]
+        return [
+            (self.src_ids[i], self.names[i], float(d))
+            for i, d in zip(candidates[order], distances[order])
+        ]
+
+    def within(self, lat, lon, radius_km):
+        # Every station within radius_km, closest first
+        reach = int(np.ceil(
+            radius_km / (self.cell_size * np.pi / 180 * EARTH_RADIUS_KM
+                         * np.cos(np.radians(min(abs(lat) + 1, 89))))
+        ))
+        row, col = self._cell(lat, lon)
+        candidates = np.array([
+            i for radius in range(reach + 1)
+            for i in self._ring(row, col, radius)
+        ], dtype=int)
+        if not len(candidates):
+            return []
+
+        distances = haversine(
+            lat, lon, self.lats[candidates], self.lons[candidates]
+        )
+        keep = distances <= radius_km
+        order = np.argsort(distances[keep])
+        return [
+            (self.src_ids[i], self.names[i], float(d))
+            for i, d in zip(candidates[keep][order], distances[keep][order])
+        ]
+
+    def in_box(self, south, west, north, east):
+        return np.flatnonzero(
+            (self.lats >= south) & (self.lats <= north)
+            & (self.lons >= west) & (self.lons <= east)
+        )
+
+    def to_json(self, path):
+        with open(path, 'w') as f:
+            json.dump({
+                'cell_size': self.cell_size,
+                'src_id': self.src_ids.tolist(),
+                'name': self.names.tolist(),
+                'lat': np.round(self.lats, 4).tolist(),
+                'lon': np.round(self.lons, 4).tolist(),
+            }, f, separators=(',', ':'))
+
+    @classmethod
+    def from_json(cls, path):
+        with open(path, 'r') as f:
+            saved = json.load(f)
+        return cls(
+            saved['src_id'], saved['name'], saved['lat'], saved['lon'],
+            cell_size=saved['cell_size']
+        )
+
+
+def write_tiles(index, store, folder, column='air_temperature', stat='mean',
+                tile_size=2.0, decimals=2):
+    # For each month, write:
+    #   <month>.bin - float32 value for every indexed station (NaN if missing),
+    #                 in index order, for whole-country views
+    #   <month>/<row>_<col>.json - the stations in each tile_size degree tile,
+    #                 for regional views
+    folder = Path(folder) / column / stat
+    folder.mkdir(parents=True, exist_ok=True)
+
+    # Line the store's stations up with the index's
+    store_rows = {s['src_id']: i for i, s in enumerate(store.stations)}
+    rows = np.array([store_rows.get(s, -1) for s in index.src_ids])
+    present = rows >= 0
+
+    tile_rows = np.floor_divide(index.lats, tile_size).astype(int)
+    tile_cols = np.floor_divide(index.lons, tile_size).astype(int)
+    tiles = dict()
+    for i, tile in enumerate(zip(tile_rows, tile_cols)):
+        tiles.setdefault(tile, []).append(i)
+
+    monthly = store.monthly[:, :, store.columns.index(column), STATS.index(stat)]
+
+    months = []
+    for m, month in enumerate(store.months):
+        values = np.full(len(index.src_ids), np.nan, dtype='float32')
+        values[present] = monthly[rows[present], m]
+        if np.isnan(values).all():
+            continue
+
+        name = str(month)
+        months.append(name)
+        values.tofile(folder / f'{name}.bin')
+
+        month_folder = folder / name
+        month_folder.mkdir(exist_ok=True)
+        for (row, col), members in tiles.items():
+            members = [i for i in members if not np.isnan(values[i])]
+            if not members:
+                continue
+            with open(month_folder / f'{row}_{col}.json', 'w') as f:
+                json.dump({
+                    'src_id': index.src_ids[members].tolist(),
+                    'value': np.round(values[members], decimals).tolist(),
+                }, f, separators=(',', ':'))
+
+    with open(folder / 'tiles.json', 'w') as f:
+        json.dump({
+            'tile_size': tile_size, 'months': months,
+            'stations': len(index.src_ids),
+        }, f)
+
+    return months
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(
+        description='Build the station index and monthly map tiles'
+    )
+    parser.add_argument('metadata', help='MIDAS station metadata CSV')
+    parser.add_argument('store', help='Station summary store folder')
+    parser.add_argument('output', help='Folder to write the index and tiles to')
+    parser.add_argument('--column', default='air_temperature')
+    parser.add_argument('--stat', default='mean', choices=STATS)
+    parser.add_argument('--tile-size', type=float, default=2.0)
+    args = parser.parse_args()
+
+    output = Path(args.output)
+    output.mkdir(parents=True, exist_ok=True)
+
+    index = StationIndex.from_metadata(args.metadata)
+    index.to_json(output / 'stations.json')
+
+    months = write_tiles(
+        index, StationStore(args.store), output, column=args.column,
+        stat=args.stat, tile_size=args.tile_size
+    )
+    print(f'{len(index.src_ids)} stations, {len(months)} months of tiles')
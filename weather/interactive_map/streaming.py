@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+
+from density import (
+    bandwidths, finish, group_stats, linear_bin, make_grid,
+    seaborn_bw_is_absolute, smooth
+)
+from midas import (
+    COLUMN_DTYPES, MONTHS, add_time_fields, density_drawer, find_header_row,
+    ridge_plot
+)
+
+
+# Wide enough for any UK air temperature, fine enough for a bw of .4
+DEFAULT_GRID = (-40, 50, 1024)
+
+
+class MonthlySummary:
+    # Running statistics for one variable, per month: count, sum, sum of
+    # squares, min, max and a histogram linear-binned onto a fixed grid. All of
+    # it is fixed size and can be merged, and the histogram can go straight
+    # into the density engine, so we never need to hold the raw observations.
+    def __init__(self, value='air_temperature', hours=(7, 18), grid=None):
+        self.value = value
+        self.hours = hours
+        self.grid = make_grid(*DEFAULT_GRID) if grid is None else grid
+
+        n = len(MONTHS)
+        self.count = np.zeros(n)
+        self.total = np.zeros(n)
+        self.squares = np.zeros(n)
+        self.lo = np.full(n, np.inf)
+        self.hi = np.full(n, -np.inf)
+        self.binned = np.zeros((n, len(self.grid)))
+        self.hours_seen = np.zeros(24, dtype=bool)
+
+    def update(self, chunk):
+        # chunk needs the value column plus Hour and Month (see add_time_fields)
+        chunk = chunk[chunk['Hour'].between(*self.hours)]
+        self.hours_seen[chunk['Hour'].unique()] = True
+
+        values = chunk[self.value].to_numpy(dtype=float)
+        months = chunk['Month'].cat.codes.to_numpy()
+        keep = np.isfinite(values) & (months >= 0)
+        values, months = values[keep], months[keep].astype(np.intp)
+
+        count, total, squares, lo, hi = group_stats(values, months, len(MONTHS))
+        self.count += count
+        self.total += total
+        self.squares += squares
+        self.lo = np.minimum(self.lo, lo)
+        self.hi = np.maximum(self.hi, hi)
+        self.binned += linear_bin(values, months, self.grid, len(MONTHS))
+
+    def merge(self, other):
+        self.count += other.count
+        self.total += other.total
+        self.squares += other.squares
+        self.lo = np.minimum(self.lo, other.lo)
+        self.hi = np.maximum(self.hi, other.hi)
+        self.binned += other.binned
+        self.hours_seen |= other.hours_seen
+        return self
+
+    @property
+    def mean(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.total / self.count
+
+    @property
+    def n_hours(self):
+        return int(self.hours_seen.sum())
+
+    def densities(self, bw=.4, absolute=None, cut=3):
+        if absolute is None:
+            absolute = seaborn_bw_is_absolute()
+
+        bws = bandwidths(self.count, self.total, self.squares, bw, absolute)
+        summed = smooth(self.binned, self.grid, bws)
+        return finish(
+            summed, self.grid, self.count, self.total, self.lo, self.hi, bws,
+            cut
+        )
+
+    def monthly_ridge_plot(self, title, hue_label, x_label, attribution,
+                           output_path, value_format='{}', palette='plasma',
+                           background_colour='whitesmoke', hspace=-.4,
+                           bottom_space=.12, facet_params=None,
+                           shape_params=None, outline_params=None, **_):
+        # Same graph as MidasData.monthly_ridge_plot, with each month coloured
+        # by its mean. Extra keyword arguments (hue, value) are accepted so the
+        # same parameters work for both.
+        _sp = shape_params.copy() if shape_params else dict()
+        _op = outline_params.copy() if outline_params else dict()
+        if 'lw' not in _op.keys():
+            _op['lw'] = 3
+
+        bw = _sp.pop('bw', .4)
+        _op.pop('bw', None)
+        _sp.pop('shade', None)
+
+        draw_month = density_drawer(
+            self.densities(bw=bw), background_colour,
+            dict(dict(alpha=1, lw=0), **_sp), _op
+        )
+
+        # Months without data get no hue, so they're left blank
+        month_hues = np.where(self.count > 0, self.mean, np.nan)
+
+        return ridge_plot(
+            month_hues, draw_month, title, hue_label, x_label, attribution,
+            output_path, value_format=value_format, palette=palette,
+            background_colour=background_colour, hspace=hspace,
+            bottom_space=bottom_space, facet_params=facet_params,
+            baseline_lw=_op['lw']
+        )
+
+
+def stream_monthly(csv_file, value='air_temperature', hours=(7, 18),
+                   chunksize=50_000, grid=None):
+    # Walk a MIDAS file in chunks, keeping only the running monthly summary.
+    # Memory use depends on the chunk size, not the size of the file.
+    summary = MonthlySummary(value=value, hours=hours, grid=grid)
+
+    reader = pd.read_csv(
+        csv_file, skiprows=find_header_row(csv_file),
+        usecols=['ob_time', value],
+        dtype={value: COLUMN_DTYPES.get(value, 'float32')},
+        chunksize=chunksize
+    )
+    with reader:
+        for chunk in reader:
+            summary.update(add_time_fields(chunk))
+
+    return summary
@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from argparse import ArgumentParser
+import json
+import os
+from pathlib import Path
+import re
+
+import numpy as np
+import pandas as pd
+
+from midas import find_header_row, read_midas_csv
+
+
+FILE_PATTERN = re.compile(
+    r'midas-open_uk-hourly-weather-obs_dv-(?P<version>\d+)_(?P<county>[^_]+)_'
+    r'(?P<src_id>\d+)_(?P<station>[^_]+)_qcv-\d+_(?P<year>\d{4})\.csv$'
+)
+
+# Columns that aren't observations - identifiers, timestamps and so on. Quality
+# flags (ending _q or _j) are skipped too.
+NOT_OBSERVATIONS = {
+    'ob_time', 'ob_end_time', 'id', 'id_type', 'met_domain_name',
+    'version_num', 'src_id', 'rec_st_ind', 'src_opr_type', 'meto_stmp_time',
+    'midas_stmp_etime', 'wind_speed_unit_id',
+}
+
+STATS = ('mean', 'min', 'max', 'q10', 'q50', 'q90')
+QUANTILES = {'q10': .1, 'q50': .5, 'q90': .9}
+
+
+def parse_filename(path):
+    match = FILE_PATTERN.search(os.path.basename(path))
+    if not match:
+        raise ValueError(f'Not a MIDAS hourly file name: {path}')
+    return match.groupdict()
+
+
+def observation_columns(path):
+    # Just the header, to work out which columns we'll be storing
+    columns = pd.read_csv(path, skiprows=find_header_row(path), nrows=0).columns
+    return [
+        c for c in columns
+        if c not in NOT_OBSERVATIONS and not c.endswith(('_q', '_j'))
+    ]
+
+
+def aggregate(values, keys):
+    # All the stats for every column, grouped by integer keys. Gives an array
+    # of (unique keys, columns, stats) plus the keys themselves.
+    grouped = values.groupby(keys)
+    parts = [grouped.mean(), grouped.min(), grouped.max()]
+    parts += [grouped.quantile(QUANTILES[s]) for s in STATS[3:]]
+    return parts[0].index.to_numpy(), np.stack([p.to_numpy() for p in parts], -1)
+
+
+class StationStore:
+    # Daily and monthly aggregates (see STATS) for every observation column,
+    # for every station, held as memory-mapped float32 arrays of shape
+    # (station, time, column, stat). Queries are just array slicing, so
+    # comparing stations or years doesn't mean going back to the CSVs.
+    def __init__(self, folder):
+        self.folder = Path(folder)
+        with open(self.folder / 'meta.json', 'r') as f:
+            self.meta = json.load(f)
+
+        self.stations = self.meta['stations']
+        self.columns = self.meta['columns']
+        self.days = pd.date_range(
+            self.meta['start'], periods=self.meta['n_days'], freq='D'
+        )
+        self.months = pd.period_range(
+            self.meta['start'], periods=self.meta['n_months'], freq='M'
+        )
+
+        shape = (len(self.stations), len(self.columns), len(STATS))
+        self.daily = np.memmap(
+            self.folder / 'daily.f32', dtype='float32', mode='r',
+            shape=(shape[0], len(self.days), *shape[1:])
+        )
+        self.monthly = np.memmap(
+            self.folder / 'monthly.f32', dtype='float32', mode='r',
+            shape=(shape[0], len(self.months), *shape[1:])
+        )
+
+    @classmethod
+    def build(cls, files, folder):
+        files = sorted(files)
+        details = [parse_filename(f) for f in files]
+
+        station_ids = sorted({d['src_id'] for d in details})
+        names = {d['src_id']: (d['station'], d['county']) for d in details}
+        stations = [
+            {'src_id': s, 'name': names[s][0], 'county': names[s][1]}
+            for s in station_ids
+        ]
+        station_index = {s: i for i, s in enumerate(station_ids)}
+
+        columns = sorted({c for f in files for c in observation_columns(f)})
+        years = sorted({int(d['year']) for d in details})
+        start = pd.Timestamp(years[0], 1, 1)
+        n_days = (pd.Timestamp(years[-1], 12, 31) - start).days + 1
+        n_months = (years[-1] - years[0] + 1) * 12
+
+        folder = Path(folder)
+        folder.mkdir(parents=True, exist_ok=True)
+
+        def allocate(name, length):
+            array = np.memmap(
+                folder / name, dtype='float32', mode='w+',
+                shape=(len(stations), length, len(columns), len(STATS))
+            )
+            array[:] = np.nan
+            return array
+
+        daily = allocate('daily.f32', n_days)
+        monthly = allocate('monthly.f32', n_months)
+
+        for path, detail in zip(files, details):
+            data = read_midas_csv(path)
+            values = data.reindex(columns=columns).apply(
+                pd.to_numeric, errors='coerce'
+            ).astype('float32')
+
+            ob_time = data['ob_time']
+            day = (ob_time.dt.normalize() - start).dt.days.to_numpy()
+            month = (
+                (ob_time.dt.year.to_numpy() - years[0]) * 12
+                + ob_time.dt.month.to_numpy() - 1
+            )
+
+            station = station_index[detail['src_id']]
+            keys, stats = aggregate(values, day)
+            daily[station, keys] = stats
+            keys, stats = aggregate(values, month)
+            monthly[station, keys] = stats
+            print(detail['station'], detail['year'])
+
+        daily.flush()
+        monthly.flush()
+
+        meta = dict(
+            stations=stations, columns=columns, stats=list(STATS),
+            start=start.strftime('%Y-%m-%d'), n_days=n_days, n_months=n_months
+        )
+        with open(folder / 'meta.json', 'w') as f:
+            json.dump(meta, f, indent=1)
+
+        return cls(folder)
+
+    def station_index(self, station):
+        # Accepts a src_id (as a number or string) or a station name
+        for i, s in enumerate(self.stations):
+            if str(station).zfill(5) == s['src_id'] or station == s['name']:
+                return i
+        raise KeyError(f'Unknown station: {station}')
+
+    def _slice(self, freq, start, end):
+        index = self.days if freq == 'daily' else self.months
+        lo = 0 if start is None else index.searchsorted(
+            pd.Timestamp(start) if freq == 'daily' else pd.Period(start, 'M')
+        )
+        hi = len(index) if end is None else index.searchsorted(
+            pd.Timestamp(end) if freq == 'daily' else pd.Period(end, 'M'),
+            side='right'
+        )
+        array = self.daily if freq == 'daily' else self.monthly
+        return array, index, slice(lo, hi)
+
+    def series(self, station, column, stat='mean', freq='daily', start=None,
+               end=None):
+        array, index, span = self._slice(freq, start, end)
+        values = array[
+            self.station_index(station), span, self.columns.index(column),
+            STATS.index(stat)
+        ]
+        return pd.Series(values, index=index[span], name=column)
+
+    def compare(self, column, stat='mean', stations=None, freq='monthly',
+                start=None, end=None):
+        # One column per station
+        array, index, span = self._slice(freq, start, end)
+        if stations is None:
+            rows = list(range(len(self.stations)))
+        else:
+            rows = [self.station_index(s) for s in stations]
+
+        values = array[rows, span, self.columns.index(column), STATS.index(stat)]
+        return pd.DataFrame(
+            values.T, index=index[span],
+            columns=[self.stations[r]['name'] for r in rows]
+        )
+
+    def plot(self, column, stat='mean', stations=None, freq='monthly',
+             start=None, end=None, ax=None, **plot_params):
+        frame = self.compare(column, stat, stations, freq, start, end)
+        return frame.plot(ax=ax, **plot_params)
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(
+        description='Build or query the station summary store'
+    )
+    parser.add_argument('store', help='Folder for the store')
+    parser.add_argument(
+        'files', nargs='*', help='MIDAS station-year CSVs to build the store from'
+    )
+    parser.add_argument('--column', default='air_temperature')
+    parser.add_argument('--stat', default='mean', choices=STATS)
+    args = parser.parse_args()
+
+    if args.files:
+        store = StationStore.build(args.files, args.store)
+    else:
+        store = StationStore(args.store)
+
+    print(store.compare(args.column, args.stat).describe().T)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from collections import Counter, namedtuple
+from datetime import datetime
+import json
+import os
+
+import pandas as pd
+
+from midas import find_header_row
+
+
+# Why a station-year wasn't drawn, and how far we got before finding out
+Rejection = namedtuple(
+    'Rejection', ['folder', 'sub', 'year', 'reason', 'stage', 'bytes', 'detail']
+)
+
+
+def observed_hours(source, hours, chunksize=20_000):
+    # Just the hour of each observation, read from the ob_time column alone and
+    # without parsing any datetimes. Stops as soon as every hour in the range
+    # has turned up, which for a complete file is usually within the first
+    # couple of days. Returns the hours seen and the number of rows read.
+    wanted = set(range(hours[0], hours[1] + 1))
+    seen = set()
+    rows = 0
+
+    reader = pd.read_csv(
+        source, skiprows=find_header_row(source), usecols=['ob_time'],
+        dtype=str, chunksize=chunksize
+    )
+    with reader:
+        for chunk in reader:
+            # "YYYY-MM-DD HH:MM:SS" - the footer doesn't parse, so drops out
+            hour = pd.to_numeric(
+                chunk['ob_time'].str.slice(11, 13), errors='coerce'
+            ).dropna()
+            rows += len(hour)
+            seen.update(int(h) for h in hour.unique())
+            if wanted <= seen:
+                break
+
+    return seen & wanted, rows
+
+
+def check_hours(source, hours):
+    # None if the file has every hour we need, otherwise (reason, detail)
+    try:
+        seen, rows = observed_hours(source, hours)
+    except (ValueError, pd.errors.ParserError) as e:
+        return 'unreadable', str(e)
+    finally:
+        if hasattr(source, 'seek'):
+            source.seek(0)
+
+    if not rows:
+        return 'no observations', None
+
+    missing = sorted(set(range(hours[0], hours[1] + 1)) - seen)
+    if missing:
+        return 'missing hours', {'missing': missing, 'rows': rows}
+    return None
+
+
+class RejectionReport:
+    # One JSON line per rejected station-year, written by the main process as
+    # results come back from the workers. Each run appends to the report,
+    # with the time it started, so earlier runs' rejections are kept.
+    def __init__(self, path):
+        self.path = path
+        self.run = datetime.now().isoformat(timespec='seconds')
+        self.counts = Counter()
+        self.skipped_bytes = Counter()
+
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.file = open(path, 'a')
+
+    def add(self, rejection):
+        self.counts[rejection.stage, rejection.reason] += 1
+        self.skipped_bytes[rejection.stage] += rejection.bytes or 0
+        record = dict(rejection._asdict(), run=self.run)
+        self.file.write(json.dumps(record) + '\n')
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def summarise(self):
+        if not self.counts:
+            print('No station-years rejected')
+            return
+
+        for (stage, reason), count in sorted(self.counts.items()):
+            print(f'Rejected at {stage}: {count} {reason}')
+        saved = self.skipped_bytes['validate']
+        if saved:
+            print(
+                f'Validation skipped full parsing of {saved / 1024 ** 2:.1f}MB'
+            )
+        print(f'Details in {self.path}')